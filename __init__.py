@@ -17,8 +17,7 @@ import re
 import pytz
 import time
 import tzlocal
-from astral import Astral
-import holidays
+from threading import RLock, Thread
 
 # for location handler
 import os, sys
@@ -27,56 +26,133 @@ from adapt.intent import IntentBuilder
 import mycroft.audio
 # from mycroft.util.format import nice_time
 from mycroft.util.format import pronounce_number, nice_date, nice_time
-from mycroft.util.lang.format_de import nice_time_de, pronounce_ordinal_de
 from mycroft.messagebus.message import Message
 from mycroft import MycroftSkill, intent_handler, intent_file_handler
 from mycroft.util.parse import extract_datetime, fuzzy_match, extract_number, normalize
 from mycroft.util.time import now_utc, default_timezone, to_local
 from mycroft.skills.core import resting_screen_handler
-from mycroft.util.parse import match_one
 from mycroft.api import Api
 
-# For Location checking
-import geocoder
-from timezonefinder import TimezoneFinder
-
-# For Holiday Checking
-from holidayapi import v1
+from .cache import MISSING, ResolutionCache
+from .cities import CityIndex, astral_cities, zone_cities
+from .clock import ClockState, next_minute
+from .countries import CountryIndex
+from .formatting import FormatCache
+from .gui_state import GuiState
+from .dates import (days_until, is_leap_year, last_weekend, next_leap_year,
+                    next_weekend, year_less_reference)
+from .gazetteer import Gazetteer
+from .holiday_index import HolidayIndex
+from .holiday_providers import create_provider
+from .holiday_store import HolidayStore
+from .mark1 import render_time
+from .metrics import Metrics
+from .http_client import HttpClient, ServiceUnavailable
+from .resources import ResourceBundles
+from .startup import StartupReport, lazy_import
+from .utterance import UtteranceParser
+from .world_clock import WorldClock, parse_zones
+
+GEONAMES_URL = 'http://api.geonames.org/searchJSON'
+
+# Most entries accepted in one skill.time.batch request
+MAX_BATCH_SIZE = 1000
+# Most local times (locations x timestamps) in one skill.time.batch answer
+MAX_BATCH_TIMES = 10000
 
 class TimeSkill(MycroftSkill):
     def __init__(self):
         super(TimeSkill, self).__init__("TimeSkill")
-        self.astral = Astral()
+        # Heavy dependencies are loaded on first use, see the startup report
+        self.startup = StartupReport()
+        # Per-stage timings, off unless enabled in the settings
+        self.metrics = Metrics(enabled=False)
+        self.hold_started = None
+        self._astral = None
+        self._tz_finder = None
         self.displayed_time = None
         self.display_tz = None 
+        self.clock_state = None
+        # GUI values and page last sent, set up by initialize()
+        self.gui_state = None
+        # Time and date strings, rendered once per minute/day and settings
+        self.format_cache = FormatCache(nice_time, nice_date)
+        self.active_alarms = 0
         self.answering_query = False
 
+        # Resolved (timezone, name) per (language, location), misses included
+        self.timezone_cache = ResolutionCache(max_size=256, ttl=6 * 3600,
+                                              negative_ttl=60)
+        # Zones of the world clock resting screen, resolved in the
+        # background and retried once a failed lookup has expired
+        self.world_clock = WorldClock(
+            self._resolve_world_zone,
+            retry_interval=self.timezone_cache.negative_ttl)
+        # .value tables and regexes per language, compiled by initialize()
+        self.resources = None
+        # Utterances parsed once, shared by the time and date handlers
+        self.utterances = UtteranceParser(normalize, extract_datetime,
+                                          extract_number,
+                                          self._extract_location)
+
         self.holiday_cache = {}
-        self.country_list = {}
+        self.holiday_indexes = {}
+        self.holiday_lock = RLock()
+        # Country names of every language, indexed on first use
+        self.countries = CountryIndex(
+            lambda: [(v.key, v.value.upper())
+                     for v in self.resources.all_values('countries')])
+        # City and timezone names, with suggestions for near misses
+        self.cities = CityIndex(self._load_cities)
 
         self.HOLIDAY_CONFIDENCE = 0.70
 
+        # Keep-alive sessions, deadlines and backoff for Geonames and
+        # the Holiday API
+        self.http = HttpClient(timeout=3, deadline=8, retries=3)
+
     def initialize(self):
-        # Start a callback that repeats every 10 seconds
+        started = time.perf_counter()
+
+        # Compiled .value tables and regexes, one bundle per language that
+        # is built (or rebuilt after a change) on its first use
+        self.resources = ResourceBundles(self.root_dir)
+        self.gui_state = GuiState(self.gui, self.bus.emit, self.skill_id)
+
+        # Start a clock tick on every minute boundary
         # TODO: Add mechanism to only start timer when UI setting
         #       is checked, but this requires a notifier for settings
         #       updates from the web.
-        
-        now = datetime.datetime.now()
-        callback_time = (datetime.datetime(now.year, now.month, now.day,
-                                           now.hour, now.minute) +
-                         datetime.timedelta(seconds=60))
-        self.schedule_repeating_event(self.update_display, callback_time, 10)
-
-        # Get all Country Names
-        self.country_list = self.translate_namedvalues('countries')
+        self.schedule_clock_tick()
+        # A new device timezone or time format changes the clock right away
+        self.add_event('configuration.updated', self.handle_clock_tick)
 
-        # Temporary Implementation of Geonames API and TZWhere Library
+        # Keep a local copy of the alarm state for the Mark 1 alarm dot,
+        # asked for now and on every clock tick without waiting for it
+        if self.platform == "mycroft_mark_1":
+            self.add_event('private.mycroftai.has_alarm.response',
+                           self.handle_alarm_state)
+            self.request_alarm_state()
+
+        # Offline place index, built at install time by requirements.sh
+        self.gazetteer = Gazetteer(os.path.join(self.root_dir,
+                                                'gazetteer.idx'))
+        if not self.gazetteer.available:
+            self.log.info('No gazetteer index, place lookups need Geonames')
+
+        # Temporary Implementation of Geonames API, TimezoneFinder is
+        # only built once Geonames is actually used
         self.username = self.settings["geonames_api_key"]
-        self.tz = TimezoneFinder()
 
-        # Temporary Implementation of Holiday API
-        self.hapi = v1(self.settings["holiday_api_key"])
+        # Holidays are generated locally unless the Holiday API is selected
+        self.holiday_provider = create_provider(self.settings, self.http,
+                                                self.startup)
+        # Fetched tables survive reloads, warm up the device's country now
+        self.holiday_store = HolidayStore(
+            os.path.join(self.file_system.path, 'holidays.db'))
+        Thread(target=self.prefetch_holidays, daemon=True).start()
+        # Next occurrences of the holidays move on at local midnight
+        self.schedule_holiday_refresh()
 
         # Make Holiday Handlers available after Holiday API is done loading
         self.register_intent_file('when.is.holiday.intent', self.handle_query_holiday_date)
@@ -84,6 +160,55 @@ class TimeSkill(MycroftSkill):
         #            .require("Holiday").optionally("Location")
         #self.register_intent(intent, self.handle_query_holiday_date)
 
+        # Times for many locations at once, for other skills and dashboards
+        self.add_event('skill.time.batch', self.handle_time_batch)
+
+        # Stage timings, published every minute and dumped on request
+        self.metrics.enabled = self.settings.get("metrics", False)
+        self.add_event('skill.time.metrics.get', self.handle_get_metrics)
+        if self.metrics.enabled:
+            self.schedule_repeating_event(self.publish_metrics, None, 60,
+                                          name='PublishMetrics')
+
+        self.startup.record('initialize', time.perf_counter() - started)
+        self.log.info('Startup report: ' + self.startup.summary())
+        if self.settings.get("warm_up", False):
+            # Optionally pay for the lazy imports now, off the intent thread
+            Thread(target=self.warm_up, daemon=True).start()
+
+    @property
+    def astral(self):
+        if self._astral is None:
+            astral = lazy_import('astral', self.startup)
+            with self.startup.measure('construct Astral'):
+                self._astral = astral.Astral()
+        return self._astral
+
+    @property
+    def tz(self):
+        if self._tz_finder is None:
+            timezonefinder = lazy_import('timezonefinder', self.startup)
+            with self.startup.measure('construct TimezoneFinder'):
+                self._tz_finder = timezonefinder.TimezoneFinder()
+        return self._tz_finder
+
+    def warm_up(self):
+        # Load the lazy dependencies ahead of the first query
+        try:
+            self.astral
+            self.tz
+            with self.startup.measure('load resources'):
+                self.resources.get(self.lang)
+            with self.startup.measure('load city index'):
+                self.cities.load()
+            lazy_import('holidays', self.startup)
+            lazy_import('.tzconvert', self.startup, __package__)
+            with self.startup.measure('precompute display times'):
+                self.formats.precompute_display_times()
+        except Exception:
+            self.log.exception('warm_up: failed')
+        self.log.info('Startup report: ' + self.startup.summary())
+
     # TODO:19.08 Moved to MycroftSkill
     @property
     def platform(self):
@@ -100,42 +225,71 @@ class TimeSkill(MycroftSkill):
 
     @resting_screen_handler('Time and Date')
     def handle_idle(self, message):
-        self.gui.clear()
         self.log.info('Activating Time/Date resting page')
-        self.gui['time_string'] = self.get_display_current_time()
-        self.gui['ampm_string'] = ''
-        self.gui['date_string'] = self.get_display_date()
-        self.gui['weekday_string'] = self.get_weekday()
-        self.gui['month_string'] = self.get_month_date()
-        self.gui['year_string'] = self.get_year()
-        self.gui.show_page('idle.qml')
+        state = self.clock_state = self.get_clock_state()
+        values = self.clock_values(state)
+        world_zones = self.get_world_zones()
+        # The resting screen is (re)activated, so always show the page
+        if world_zones:
+            values['world_zones'] = world_zones
+            self.gui_state.show('world_clock.qml', values, force=True)
+        else:
+            self.gui_state.show('idle.qml', values, force=True)
+
+    def clock_values(self, state):
+        return {
+            'time_string': state.time_string,
+            'ampm_string': '',  # TODO
+            'date_string': state.date_string,
+            'weekday_string': state.weekday_string,
+            'month_string': state.month_string,
+            'year_string': state.year_string,
+        }
 
     @property
     def use_24hour(self):
         return self.config_core.get('time_format') == 'full'
 
-    def get_timezone(self, locale):   
+    @property
+    def formats(self):
+        # Tables are dropped whenever the language or formats change
+        self.format_cache.configure(self.lang, self.use_24hour,
+                                    self.config_core.get('date_format'))
+        return self.format_cache
+
+    def get_timezone(self, locale, network=True):
+        # Resolving walks several lookup layers (and maybe the network), so
+        # remember the answer, including "not found", for a while.
+        with self.metrics.span('get_timezone'):
+            key = (self.lang, ' '.join(str(locale).lower().split()))
+            result = self.timezone_cache.get(key)
+            if result is MISSING:
+                result = self._resolve_timezone(locale, network)
+                if result or network:
+                    # An offline miss may still be found by Geonames
+                    self.timezone_cache.put(key, result)
+            return result
+
+    def _resolve_timezone(self, locale, network=True):
         try:
             # This handles codes like "America/Los_Angeles"
             return (pytz.timezone(locale), locale)
         except:
             pass
 
-        try:
-            # This handles common city names, like "Dallas" or "Paris"
-            return (pytz.timezone(self.astral[locale].timezone), locale)
-        except:
-            pass
+        # This handles common city names, like "Dallas" or "Paris", and the
+        # timezone.value lookup table, e.g. "china = GMT+8"
+        city = self.cities.lookup(locale)
+        if city:
+            return (pytz.timezone(city.timezone), locale)
 
-        # Check lookup table for other timezones.  This can also
-        # be a translation layer.
-        # E.g. "china = GMT+8"
+        # Offline place index, answers known places without the network
+        place = self.gazetteer.lookup(locale)
+        if place:
+            return (pytz.timezone(place.timezone), place.name)
 
-        timezones = self.translate_namedvalues("timezone.value")
-        for timezone in timezones:
-            if locale.lower() == timezone.lower():
-                # assumes translation is correct
-                return (pytz.timezone(timezones[timezone].strip()), locale)
+        if not network:
+            return None
 
         # Check if the locale given is a country. tznames does not get the correct timezone
         # because the bounding box from the Geonames API gives the bounding box of the
@@ -147,34 +301,80 @@ class TimeSkill(MycroftSkill):
             pass
         
         # Use Geonames API as last resort for finding the Timezone
+        if not self.settings.get("geonames_fallback", True):
+            return None
         timezone, place = self.get_timezone_geonames(locale)
         if (timezone) and (place):
             return (pytz.timezone(timezone), place)
 
         return None
 
+    def _load_cities(self):
+        # timezone.value first, so a translation can override a city name
+        cities = [tuple(v) + (True,)
+                  for v in self.resources.all_values('timezone')]
+        cities += astral_cities(self.astral.geocoder)
+        cities += zone_cities(pytz.common_timezones)
+        return [city for city in cities if city[2] in pytz.all_timezones_set]
+
+    def suggest_city(self, location):
+        """ Get the known City closest to a location that did not resolve.
+
+        Country names are left to Geonames, "germany" is not a misheard
+        "Germantown".
+        """
+        if self.get_country_code(location):
+            return None
+        return self.cities.suggest(location)
+
+    def confirm_location(self, location):
+        """ Offer the closest known city for a location that is not known
+        offline, returning the location to use.
+
+        A near miss ("pariss") is asked about before going to Geonames,
+        which still gets the location if the user says no.
+        """
+        if not location or self.get_timezone(location, network=False):
+            return location
+        city = self.suggest_city(location)
+        if city and self.ask_yesno('did.you.mean.timezone',
+                                   {'zone_name': city.name}) == 'yes':
+            return city.name
+        return location
+
     # Temporary implementation. Should be in the GeonamesAPI class
     def get_location_data(self, search_string):
-        result = []
+        parameters = {
+            'q':        search_string,
+            'maxRows':  1,
+            'username': self.username,
+        }
+
         try:
-            result = geocoder.geonames(search_string, maxRows=1, key=self.username)
-        except ConnectionError as e:
-            time.sleep(0.5) 
-            self.log.info('get_location_data: Reconnecting ...')
-            self.get_location_data(search_string)
+            with self.metrics.span('geonames'):
+                result = self.http.get_json(
+                    self.settings.get("geonames_url") or GEONAMES_URL,
+                    parameters)
+        except ServiceUnavailable as e:
+            self.log.info('get_location_data: {}'.format(e))
+            return None
 
-        return result
+        places = result.get('geonames') or []
+        return places[0] if places else None
 
     # Temporary implementation. Should be in the GeonamesAPI class
     def get_timezone_geonames(self, search_string):
         location_data = self.get_location_data(search_string)
+        if not location_data:
+            return (None, None)
 
-        if (location_data.address == location_data.country): 
-            place = location_data.country
+        if (location_data['name'] == location_data['countryName']):
+            place = location_data['countryName']
         else:
-            place = location_data.address + ' ' + location_data.country
+            place = location_data['name'] + ' ' + location_data['countryName']
 
-        timezone = self.tz.timezone_at(lat=float(location_data.lat), lng=float(location_data.lng))
+        timezone = self.tz.timezone_at(lat=float(location_data['lat']),
+                                       lng=float(location_data['lng']))
         return (timezone, place)
 
     def get_local_datetime(self, location, dtUTC=None):
@@ -196,22 +396,13 @@ class TimeSkill(MycroftSkill):
         return dtUTC.astimezone(tz)
 
     # Find the ISO-2 Country Code from list of Countries and their different names
-    def get_country_code(self, country_string): 
-        while (len(self.country_list) == 0):
-            time.sleep(0.25)
-
-        try:
-            return self.country_list[str(country_string).lower()]
-        except:
-            return None
+    def get_country_code(self, country_string):
+        return self.countries.lookup(str(country_string))
 
     def get_display_date(self, day=None, location=None):
         if not day:
             day = self.get_local_datetime(location)
-        if self.config_core.get('date_format') == 'MDY':
-            return day.strftime("%-m/%-d/%Y")
-        else:
-            return day.strftime("%Y/%-d/%-m")
+        return self.formats.display_date(day)
 
     def get_display_current_time(self, location=None, dtUTC=None):
         # Get a formatted digital clock time based on the user preferences
@@ -219,8 +410,8 @@ class TimeSkill(MycroftSkill):
         if not dt:
             return None
 
-        return nice_time(dt, self.lang, speech=False,
-                         use_24hour=self.use_24hour)
+        with self.metrics.span('format_time'):
+            return self.formats.display_time(dt)
 
     def get_spoken_current_time(self, location=None, dtUTC=None, force_ampm=False):
         # Get a formatted spoken time based on the user preferences
@@ -231,105 +422,108 @@ class TimeSkill(MycroftSkill):
         # speak AM/PM when talking about somewhere else
         say_am_pm = bool(location) or force_ampm
 
-        s = nice_time(dt, self.lang, speech=True,
-                      use_24hour=self.use_24hour, use_ampm=say_am_pm)
+        with self.metrics.span('format_time'):
+            s = self.formats.spoken_time(dt, use_ampm=say_am_pm)
         # HACK: Mimic 2 has a bug with saying "AM".  Work around it for now.
         if say_am_pm:
             s = s.replace("AM", "A.M.")
         return s
 
-    def display(self, display_time):
+    def display(self, display_time, date_string=None):
         if display_time:
             if self.platform == "mycroft_mark_1":
                 self.display_mark1(display_time)
-            self.display_gui(display_time)
+            self.display_gui(display_time, date_string)
 
     def display_mark1(self, display_time):
-        # Map characters to the display encoding for a Mark 1
-        # (4x8 except colon, which is 2x8)
-        code_dict = {
-            ':': 'CIICAA',
-            '0': 'EIMHEEMHAA',
-            '1': 'EIIEMHAEAA',
-            '2': 'EIEHEFMFAA',
-            '3': 'EIEFEFMHAA',
-            '4': 'EIMBABMHAA',
-            '5': 'EIMFEFEHAA',
-            '6': 'EIMHEFEHAA',
-            '7': 'EIEAEAMHAA',
-            '8': 'EIMHEFMHAA',
-            '9': 'EIMBEBMHAA',
-        }
-
-        # clear screen (draw two blank sections, numbers cover rest)
-        if len(display_time) == 4:
-            # for 4-character times, 9x8 blank
-            self.enclosure.mouth_display(img_code="JIAAAAAAAAAAAAAAAAAA",
-                                         refresh=False)
-            self.enclosure.mouth_display(img_code="JIAAAAAAAAAAAAAAAAAA",
-                                         x=22, refresh=False)
-        else:
-            # for 5-character times, 7x8 blank
-            self.enclosure.mouth_display(img_code="HIAAAAAAAAAAAAAA",
-                                         refresh=False)
-            self.enclosure.mouth_display(img_code="HIAAAAAAAAAAAAAA",
-                                         x=24, refresh=False)
-
-        # draw the time, centered on display
-        xoffset = (32 - (4*(len(display_time))-2)) / 2
-        for c in display_time:
-            if c in code_dict:
-                self.enclosure.mouth_display(img_code=code_dict[c],
-                                             x=xoffset, refresh=False)
-                if c == ":":
-                    xoffset += 2  # colon is 1 pixels + a space
-                else:
-                    xoffset += 4  # digits are 3 pixels + a space
-
-        if self._is_alarm_set():
-            # Show a dot in the upper-left
-            self.enclosure.mouth_display(img_code="CIAACA", x=29, refresh=False)
-        else:
-            self.enclosure.mouth_display(img_code="CIAAAA", x=29, refresh=False)
+        # Whole 32x8 frame in a single message, frames are cached
+        self.enclosure.mouth_display(
+            img_code=render_time(display_time, self._is_alarm_set()),
+            refresh=False)
 
     def _is_alarm_set(self):
-        msg = self.bus.wait_for_response(Message("private.mycroftai.has_alarm"))
-        return msg and msg.data.get("active_alarms", 0) > 0
-
-    def display_gui(self, display_time):
+        return self.active_alarms > 0
+
+    def request_alarm_state(self, message=None):
+        # Answered asynchronously, see handle_alarm_state
+        self.bus.emit(Message("private.mycroftai.has_alarm"))
+
+    def handle_alarm_state(self, message):
+        active_alarms = message.data.get("active_alarms", 0)
+        changed = (active_alarms > 0) != self._is_alarm_set()
+        self.active_alarms = active_alarms
+        if changed and self.displayed_time:
+            # redraw the clock so the alarm dot follows right away
+            self.displayed_time = None
+            self.update_display()
+
+    def display_gui(self, display_time, date_string=None):
         """ Display time on the Mycroft GUI. """
-        self.gui.clear()
-        self.gui['time_string'] = display_time
-        self.gui['ampm_string'] = ''
-        self.gui['date_string'] = self.get_display_date()
-        self.gui.show_page('time.qml')
+        self.gui_state.show('time.qml', {
+            'time_string': display_time,
+            'ampm_string': '',
+            'date_string': date_string or self.get_display_date(),
+        })
 
     def _is_display_idle(self):
         # check if the display is being used by another skill right now
         # or _get_active() == "TimeSkill"
         return self.enclosure.display_manager.get_active() == ''
 
+    def get_clock_state(self):
+        """ Get the local time and every string the clock displays. """
+        now = self.get_local_datetime(None)
+        formats = self.formats
+        return ClockState(now,
+                          formats.display_time(now),
+                          formats.display_date(now),
+                          formats.weekday(now),
+                          formats.month_date(now),
+                          formats.year(now))
+
+    def schedule_clock_tick(self):
+        # One-shot event re-armed every tick, so the wake-up stays on the
+        # minute even if the system clock jumps (e.g. NTP sync at boot)
+        self.cancel_scheduled_event('ClockTick')
+        self.schedule_event(self.handle_clock_tick, next_minute(),
+                            name='ClockTick')
+
+    def handle_clock_tick(self, message=None):
+        try:
+            if self.platform == "mycroft_mark_1" and \
+                    self.settings.get("show_time", False):
+                # The answer redraws the clock if the alarm dot changed
+                self.request_alarm_state()
+            self.update_display()
+        finally:
+            self.schedule_clock_tick()
+
     def update_display(self, force=False):
         # Don't show idle time when answering a query to prevent
         # overwriting the displayed value.
         if self.answering_query:
             return
 
-        self.gui['time_string'] = self.get_display_current_time()
-        self.gui['date_string'] = self.get_display_date()
-        self.gui['ampm_string'] = '' # TODO
+        # Computed once, shared by the GUI, Mark 1 and resting screen
+        state = self.clock_state = self.get_clock_state()
+        # Only the strings that changed since the last tick are sent
+        values = self.clock_values(state)
+        if self.gui_state.page == 'world_clock.qml':
+            values['world_zones'] = self.get_world_zones() or []
+        self.gui_state.update(values)
 
         if self.settings.get("show_time", False):
             # user requested display of time while idle
             if (force is True) or self._is_display_idle():
-                current_time = self.get_display_current_time()
+                current_time = state.time_string
                 if self.displayed_time != current_time:
                     self.displayed_time = current_time
-                    self.display(current_time)
+                    self.display(current_time, state.date_string)
                     # return mouth to 'idle'
                     self.enclosure.display_manager.remove_active()
             else:
                 self.displayed_time = None  # another skill is using display
+                self.gui_state.invalidate()
         else:
             # time display is not wanted
             if self.displayed_time:
@@ -340,31 +534,207 @@ class TimeSkill(MycroftSkill):
                     self.enclosure.display_manager.remove_active()
                 self.displayed_time = None
 
+    def _resolve_world_zone(self, name):
+        result = self.get_timezone(name)
+        return result[0] if result else None
+
+    def get_world_zones(self):
+        """ Get the world clock's GUI entries, None if it is turned off. """
+        if not self.settings.get("world_clock", False):
+            return None
+        self.world_clock.configure(
+            parse_zones(self.settings.get("world_clock_zones")))
+        if self.world_clock.claim_pending():
+            # Lookups may go to Geonames, keep them off the GUI path
+            Thread(target=self.resolve_world_zones, daemon=True).start()
+        return self.world_clock.update(time.time(), self.formats)
+
+    def resolve_world_zones(self):
+        shown = len(self.world_clock.zones)
+        unresolved = self.world_clock.resolve_pending()
+        if unresolved:
+            self.log.warning('World clock: unknown places: ' +
+                             ', '.join(unresolved))
+        if len(self.world_clock.zones) != shown:
+            # Only the values, the page is switched by handle_idle, which
+            # knows the resting screen is active
+            self.gui_state.update(
+                {'world_zones': self.get_world_zones() or []})
+
+    def hold_display(self, seconds, reset_mouth=True):
+        """ Keep a query's answer on screen for a while.
+
+        The hold ends in a scheduled event, so the intent handler returns
+        right away. A newer query replaces the pending hold.
+        """
+        self.answering_query = True
+        self.hold_started = time.perf_counter()
+        self.cancel_scheduled_event('DisplayHold')
+        when = datetime.datetime.now() + datetime.timedelta(seconds=seconds)
+        self.schedule_event(self.release_display, when,
+                            data={'reset_mouth': reset_mouth},
+                            name='DisplayHold')
+
+    def release_display(self, message):
+        if mycroft.audio.is_speaking():
+            # Keep the answer up until it has been spoken
+            when = datetime.datetime.now() + datetime.timedelta(seconds=1)
+            self.schedule_event(self.release_display, when,
+                                data=message.data, name='DisplayHold')
+            return
+
+        if message.data.get('reset_mouth', True):
+            self.enclosure.mouth_reset()
+            self.enclosure.activate_mouth_events()
+        self.answering_query = False
+        self.displayed_time = None
+        # Other skills may show their pages from now on
+        self.gui_state.invalidate()
+        if self.hold_started:
+            self.metrics.observe('display_hold', (time.perf_counter() -
+                                                  self.hold_started) * 1000)
+            self.hold_started = None
+
     def _extract_location(self, utt):
         # if "Location" in message.data:
         #     return message.data["Location"]
-        rx_file = self.find_resource('location.rx', 'regex')
-        if rx_file:
-            with open(rx_file) as f:
-                for pat in f.read().splitlines():
-                    pat = pat.strip()
-                    if pat and pat[0] == "#":
-                        continue
-                    res = re.search(pat, utt)
-                    if res:
-                        try:
-                            return res.group("Location")
-                        except IndexError:
-                            pass
-        return None
+        with self.metrics.span('extract_location'):
+            return self.resources.search_group(self.lang, 'location.rx', utt,
+                                               'Location')
+
+    def parse_utterance(self, message):
+        with self.metrics.span('parse_utterance'):
+            return self.utterances.parse(message.data.get('utterance', ""),
+                                         self.lang)
+
+    ######################################################################
+    ## Messagebus API
+
+    def get_batch_entry(self, location, dtUTC, timestamps=None):
+        """ Local time of one location of a batch request.
+
+        With a list of `timestamps` the entry holds lists instead, all
+        converted in one pass over the zone's transition table.
+        """
+        entry = {'location': location}
+        try:
+            resolved = self.get_timezone(location)
+            if not resolved:
+                entry['error'] = 'location not found'
+                return entry
+            tz, place = resolved
+            if timestamps is not None:
+                tzconvert = lazy_import('.tzconvert', self.startup,
+                                        __package__)
+                local = tzconvert.to_local_many(timestamps, tz)
+                entry.update({
+                    'place': place,
+                    'timezone': tz.zone,
+                    'local': [str(t) for t in tzconvert.wall_datetimes(local)],
+                    'offset': local.offset.tolist(),
+                    'dst': local.dst.tolist(),
+                    'weekday': local.weekday.tolist(),
+                })
+                return entry
+            dt = dtUTC.astimezone(tz)
+        except Exception as e:
+            entry['error'] = str(e) or e.__class__.__name__
+            return entry
+
+        entry.update({
+            'place': place,
+            'timezone': tz.zone,
+            'local': dt.isoformat(),
+            'offset': int(dt.utcoffset().total_seconds()),
+            'dst': bool(dt.dst()),
+        })
+        return entry
+
+    def handle_time_batch(self, message):
+        """ Answer skill.time.batch with the time in many places.
+
+        Request data:
+            locations (list): place names or timezone names
+            utc (float): optional POSIX timestamp, defaults to now
+            timestamps (list): optional POSIX timestamps instead of `utc`,
+                               converted in bulk for every location
+
+        The response lists one entry per location, in request order, with
+        the local time, UTC offset in seconds and DST flag, or an 'error'.
+        Unknown places may go to Geonames, so the request is answered from
+        a worker thread and the bus handler returns right away.
+        """
+        locations = message.data.get('locations') or []
+        if not isinstance(locations, list):
+            locations = [locations]
+        if len(locations) > MAX_BATCH_SIZE:
+            self.bus.emit(message.response(
+                {'error': 'at most {} locations'.format(MAX_BATCH_SIZE)}))
+            return
+
+        utc = message.data.get('utc')
+        timestamps = message.data.get('timestamps')
+        if timestamps is not None:
+            tzconvert = lazy_import('.tzconvert', self.startup, __package__)
+            if not isinstance(timestamps, list) or \
+                    not all(tzconvert.valid_timestamp(t) for t in timestamps):
+                self.bus.emit(message.response({'error': 'invalid timestamps'}))
+                return
+            if len(timestamps) * max(len(locations), 1) > MAX_BATCH_TIMES:
+                self.bus.emit(message.response(
+                    {'error': 'at most {} local times'.format(
+                        MAX_BATCH_TIMES)}))
+                return
+            Thread(target=self.answer_time_batch, daemon=True,
+                   args=(message, locations, None, timestamps)).start()
+            return
+
+        try:
+            if utc is None:
+                dtUTC = now_utc()
+            else:
+                dtUTC = datetime.datetime.fromtimestamp(float(utc), pytz.utc)
+        except (TypeError, ValueError, OverflowError, OSError):
+            self.bus.emit(message.response({'error': 'invalid utc'}))
+            return
+
+        Thread(target=self.answer_time_batch, daemon=True,
+               args=(message, locations, dtUTC)).start()
+
+    def answer_time_batch(self, message, locations, dtUTC, timestamps=None):
+        results = [self.get_batch_entry(str(location), dtUTC, timestamps)
+                   for location in locations]
+        if timestamps is not None:
+            data = {'timestamps': timestamps, 'results': results}
+        else:
+            data = {'utc': dtUTC.isoformat(), 'results': results}
+        self.bus.emit(message.response(data))
+
+    def get_metrics(self):
+        counters = {'timezone_cache.' + k: v
+                    for k, v in self.timezone_cache.stats.items()}
+        counters.update({'utterance_cache.' + k: v
+                         for k, v in self.utterances.cache.stats.items()})
+        counters['gui.updates'] = self.gui_state.updates
+        data = self.metrics.snapshot(counters)
+        data['enabled'] = self.metrics.enabled
+        data['startup_ms'] = {name: seconds * 1000 for name, seconds
+                              in self.startup.timings.items()}
+        return data
+
+    def publish_metrics(self, message=None):
+        self.bus.emit(Message('skill.time.metrics', self.get_metrics()))
+
+    def handle_get_metrics(self, message):
+        self.bus.emit(message.response(self.get_metrics()))
 
     ######################################################################
     ## Time queries / display
 
     # Current Time Intent Handlers
     def handle_query_current_time(self, message):
-        utt = message.data.get('utterance', "")       
-        location = self._extract_location(utt)
+        location = self.parse_utterance(message).location
+        location = self.confirm_location(location)
         current_time = self.get_spoken_current_time(location)
         
         if not current_time:
@@ -386,12 +756,7 @@ class TimeSkill(MycroftSkill):
         self.answering_query = True
         self.enclosure.deactivate_mouth_events()
         self.display(self.get_display_current_time(location))
-        time.sleep(5)
-        mycroft.audio.wait_while_speaking()
-        self.enclosure.mouth_reset()
-        self.enclosure.activate_mouth_events()
-        self.answering_query = False
-        self.displayed_time = None
+        self.hold_display(5)
 
     @intent_handler(IntentBuilder("current_time_handler_simple").
                     require("Time").optionally("Location"))
@@ -401,13 +766,9 @@ class TimeSkill(MycroftSkill):
     # Future Time Intent Handlers
     @intent_file_handler("what.time.will.it.be.intent")
     def handle_query_future_time(self, message):
-        utt = normalize(message.data.get('utterance', "").lower())
-        extract = extract_datetime(utt)
-
-        if extract:
-            dt = extract[0]
-            utt = extract[1]
-        location = self._extract_location(utt)
+        parsed = self.parse_utterance(message)
+        dt = parsed.datetime
+        location = self.confirm_location(parsed.date_location)
         future_time = self.get_spoken_current_time(location, dt, True)
 
         if not future_time:
@@ -420,19 +781,14 @@ class TimeSkill(MycroftSkill):
         self.answering_query = True
         self.enclosure.deactivate_mouth_events()
         self.display(self.get_display_current_time(location, dt))
-        time.sleep(5)
-        mycroft.audio.wait_while_speaking()
-        self.enclosure.mouth_reset()
-        self.enclosure.activate_mouth_events()
-        self.answering_query = False
-        self.displayed_time = None
+        self.hold_display(5)
 
     @intent_handler(IntentBuilder("").require("Display").require("Time").
                     optionally("Location"))
     def handle_show_time(self, message):
         self.display_tz = None
-        utt = message.data.get('utterance', "")
-        location = self._extract_location(utt)
+        location = self.parse_utterance(message).location
+        location = self.confirm_location(location)
         if location:
             tz = self.get_timezone(location)[0]
             if not tz:
@@ -453,16 +809,13 @@ class TimeSkill(MycroftSkill):
     @intent_handler(IntentBuilder("").require("Query").require("Date").
                     optionally("Location"))
     def handle_query_date(self, message):
-        utt = message.data.get('utterance', "").lower()
-        extract = extract_datetime(utt)
-        day = extract[0]
+        parsed = self.parse_utterance(message)
+        day = parsed.datetime or to_local(now_utc())
 
         # check if a Holiday was requested, e.g. "What day is Christmas?"
-        year = extract_number(utt)
-        if not year or year < 1500 or year > 3000:  # filter out non-years
-            year = day.year
+        year = parsed.year or day.year
 
-        location = self._extract_location(utt)
+        location = self.confirm_location(parsed.date_location)
         if location:
             # TODO: Timezone math!
             today = to_local(now_utc())
@@ -472,20 +825,14 @@ class TimeSkill(MycroftSkill):
         if not day:
             return  # failed in timezone lookup
 
-        speak = nice_date(day, lang=self.lang)
+        speak = self.formats.spoken_date(day)
         # speak it
         self.speak_dialog("date", {"date": speak})
 
         # and briefly show the date
         self.answering_query = True
         self.show_date(location, day=day)
-        time.sleep(10)
-        mycroft.audio.wait_while_speaking()
-        if self.platform == "mycroft_mark_1":
-            self.enclosure.mouth_reset()
-            self.enclosure.activate_mouth_events()
-        self.answering_query = False
-        self.displayed_time = None
+        self.hold_display(10, reset_mouth=self.platform == "mycroft_mark_1")
 
     @intent_handler(IntentBuilder("").require("Query").require("Month").
                     optionally("Location"))
@@ -508,13 +855,10 @@ class TimeSkill(MycroftSkill):
     @intent_handler(IntentBuilder("").optionally("Query").require("Dates")
                 .require("Future").require("Weekend"))
     def handle_date_future_weekend(self, message):
-        # Strip year off nice_date as request is inherently close
-        # Don't pass `now` to `nice_date` as a
-        # request on Friday will return "tomorrow"
-        saturday_date = ', '.join(nice_date(extract_datetime(
-                        'this saturday')[0]).split(', ')[:2])
-        sunday_date = ', '.join(nice_date(extract_datetime(
-                      'this sunday')[0]).split(', ')[:2])
+        # Year is left off as request is inherently close
+        saturday, sunday = next_weekend(self.get_local_today())
+        saturday_date = self.get_date_without_year(saturday)
+        sunday_date = self.get_date_without_year(sunday)
         self.speak_dialog('date.future.weekend', {
             'direction': 'next',
             'saturday_date': saturday_date,
@@ -524,13 +868,10 @@ class TimeSkill(MycroftSkill):
     @intent_handler(IntentBuilder("").optionally("Query").require("Dates")
                 .require("Past").require("Weekend"))
     def handle_date_last_weekend(self, message):
-        # Strip year off nice_date as request is inherently close
-        # Don't pass `now` to `nice_date` as a
-        # request on Monday will return "yesterday"
-        saturday_date = ', '.join(nice_date(extract_datetime(
-                        'last saturday')[0]).split(', ')[:2])
-        sunday_date = ', '.join(nice_date(extract_datetime(
-                      'last sunday')[0]).split(', ')[:2])
+        # Year is left off as request is inherently close
+        saturday, sunday = last_weekend(self.get_local_today())
+        saturday_date = self.get_date_without_year(saturday)
+        sunday_date = self.get_date_without_year(sunday)
         self.speak_dialog('date.last.weekend', {
             'direction': 'last',
             'saturday_date': saturday_date,
@@ -564,11 +905,11 @@ class TimeSkill(MycroftSkill):
                             {"holiday": str(holiday), "location": str(location)})
                 return
 
-        year = datetime.datetime.now().year
-        holiday_date = self.find_holiday_date(holiday.lower(), country_code, year)
+        holiday_date = self.find_holiday_date(holiday.lower(), country_code)
 
         if holiday_date != None:
-            date = nice_date(datetime.datetime.strptime(holiday_date, '%Y-%m-%d'))
+            date = self.formats.spoken_date(
+                datetime.datetime.combine(holiday_date, datetime.time()))
 
             if location == None:
                 self.speak_dialog('holiday.date', {"holiday": str(holiday),
@@ -584,55 +925,158 @@ class TimeSkill(MycroftSkill):
                 self.speak_dialog('holiday.with.location.not.found', {"holiday": str(holiday),
                                                                       "location": str(location)})
 
-    # Update the Holiday List Cache from the Holiday API
-    def update_holiday_list(self, country_code, year):
-        parameters = {
-            'country':  country_code,
-            'year':     year,
-            'pretty':   True,
-        }
+    @intent_handler(IntentBuilder("").require("HolidayHowManyDays"))
+    def handle_query_holiday_countdown(self, message):
+        # "how many days until christmas (in germany)"
+        utt = message.data.get('utterance', "").lower()
+        phrase = message.data.get('HolidayHowManyDays', "").lower()
+        holiday = utt.split(phrase, 1)[-1].strip() if phrase else utt
+        location = self._extract_location(holiday)
+        if location:
+            holiday = re.sub(r'\s*\b(at|in|for|on) ' + re.escape(location) +
+                             '$', '', holiday)
+            country_code = self.get_country_code(location)
+        else:
+            country_code = self.location['city']['state']['country']['code']
+        if not holiday:
+            return
+
+        holiday_date = None
+        if country_code:
+            holiday_date = self.find_holiday_date(holiday, country_code)
+        if holiday_date is None:
+            if location:
+                self.speak_dialog('holiday.with.location.not.found',
+                                  {"holiday": holiday, "location": location})
+            else:
+                self.speak_dialog('holiday.not.found', {"holiday": holiday})
+            return
+
+        days = days_until(holiday_date, self.get_local_today().date())
+        if days == 0:
+            self.speak_dialog('holiday.countdown.today', {"holiday": holiday})
+        elif days == 1:
+            self.speak_dialog('holiday.countdown.tomorrow',
+                              {"holiday": holiday})
+        elif location:
+            self.speak_dialog('holiday.countdown.with.location',
+                              {"holiday": holiday, "location": location,
+                               "days": days})
+        else:
+            self.speak_dialog('holiday.countdown', {"holiday": holiday,
+                                                    "days": days})
 
+    def shutdown(self):
+        self.holiday_store.close()
+        super(TimeSkill, self).shutdown()
+
+    # Load this and next year's holidays for the device's country, so the
+    # first holiday question after a restart doesn't wait for them
+    def prefetch_holidays(self):
+        try:
+            country_code = self.location['city']['state']['country']['code']
+            self.get_holiday_index(country_code)
+        except Exception:
+            self.log.exception('prefetch_holidays: failed')
+
+    def schedule_holiday_refresh(self):
+        now = to_local(now_utc())
+        midnight = datetime.datetime.combine(
+            now.date() + datetime.timedelta(days=1), datetime.time(),
+            tzinfo=now.tzinfo)
+        self.cancel_scheduled_event('HolidayRefresh')
+        self.schedule_event(self.handle_holiday_refresh, midnight,
+                            name='HolidayRefresh')
+
+    # Advance every loaded country to the new day, loading next year's
+    # holidays when the year turns
+    def handle_holiday_refresh(self, message=None):
+        try:
+            with self.holiday_lock:
+                country_codes = list(self.holiday_indexes)
+            for country_code in country_codes:
+                self.get_holiday_index(country_code)
+        except Exception:
+            self.log.exception('handle_holiday_refresh: failed')
+        finally:
+            self.schedule_holiday_refresh()
+
+    # Get a Holiday List from the Holiday Store, or the Holiday Provider
+    def fetch_holidays(self, country_code, year):
+        provider = self.holiday_provider.name
+        holidays = self.holiday_store.get(provider, country_code, year)
+        if holidays is None:
+            with self.metrics.span('holiday_fetch'):
+                holidays = self.holiday_provider.holidays(country_code, year)
+            # An empty table is most likely a gap in the source, so it is
+            # asked for again next time instead of kept for a month
+            if holidays:
+                self.holiday_store.put(provider, country_code, year,
+                                       holidays)
+        return holidays
+
+    # Update the Holiday List Cache from the Holiday Store or Provider
+    def update_holiday_list(self, country_code, year):
         try:
             if (self.holiday_cache.get(country_code)):
                 if (self.holiday_cache[country_code].get(year) == None):
                     self.holiday_cache[country_code].update(
-                                {year: self.hapi.holidays(parameters)['holidays']})
+                                {year: self.fetch_holidays(country_code, year)})
             else:
                 self.holiday_cache.update(
-                                {country_code: {year: self.hapi.holidays(parameters)['holidays']}})
-        except ConnectionError as e:
-            time.sleep(0.5) 
-            self.log.info('update_holiday_list: Reconnecting ...')
-            self.update_holiday_list(country_code, year)
-
-    # Fuzzy Logic Match the Holiday String from the Holiday List Cache
-    def find_holiday_date(self, holiday_string, country_code, year):
-        if (self.holiday_cache.get(country_code) == None) or \
-                    (self.holiday_cache[country_code].get(year) == None):
-            self.update_holiday_list(country_code, year)
-
-        highest_Token_Set_Ratio = 0
-        nearest_match = ''
-        holiday_list = []
-
-        # Build first an array of Holidays for the current year and country
-        for holiday in self.holiday_cache[country_code][year]:
-            holiday_list.append(holiday['name'].replace('\'', '').lower())
-        
-        # Fuzzy Logic Match the Holiday String from the array
-        match, confidence = match_one(holiday_string.replace('\'', '').lower(), holiday_list)
-
-        if (confidence >= self.HOLIDAY_CONFIDENCE):
-            now = datetime.datetime.now()
-            holiday_date_str = self.holiday_cache[country_code][year][holiday_list.index(match)]['date']
-            holiday_date = datetime.datetime.strptime(holiday_date_str, '%Y-%m-%d')
-            difference = now - holiday_date
-
-            # If the date has already passed, iterate the function to search again for the following year
-            if (difference.total_seconds() > 0):
-                return self.find_holiday_date(holiday_string, country_code, year + 1)
-            else:
-                return holiday_date_str
+                                {country_code: {year: self.fetch_holidays(country_code, year)}})
+        except ServiceUnavailable as e:
+            # Left out of the cache so the next question tries again
+            self.log.info('update_holiday_list: {}'.format(e))
+
+    # Search index over a country's holidays for this and next year, with
+    # the next occurrence of each holiday as of today
+    def get_holiday_index(self, country_code):
+        today = self.get_local_today().date()
+        year = today.year
+        # Shared with the prefetch thread started by initialize()
+        with self.holiday_lock:
+            index = self.holiday_indexes.get(country_code)
+            if index is None:
+                index = self.holiday_indexes[country_code] = HolidayIndex()
+
+            added = False
+            for y in (year, year + 1):
+                if y in index.years:
+                    continue
+                if (self.holiday_cache.get(country_code) == None) or \
+                            (self.holiday_cache[country_code].get(y) == None):
+                    self.update_holiday_list(country_code, y)
+                holidays = self.holiday_cache.get(country_code, {}).get(y)
+                if holidays is None:
+                    continue  # provider unavailable right now
+                index.add_year(y, holidays)
+                added = True
+
+            if added:
+                aliases = self.resources.get(self.lang).named_values(
+                    'holidays')
+                unknown = [alias for alias, name in aliases.items()
+                           if not index.add_alias(alias, name.strip())]
+                if unknown:
+                    # Fine for holidays the country doesn't have, but also
+                    # catches a target name no provider uses
+                    self.log.debug('Holiday aliases without a holiday in '
+                                   '{}: {}'.format(country_code,
+                                                   ', '.join(unknown)))
+            if index.today != today:
+                index.advance(today)
+            return index
+
+    # Fuzzy Logic Match the Holiday String against the Holiday Index, and
+    # get its next occurrence (a date) from the index's table
+    def find_holiday_date(self, holiday_string, country_code):
+        with self.metrics.span('holiday_lookup'):
+            index = self.get_holiday_index(country_code)
+            match = index.find(holiday_string)
+
+        if match and match.date and match.confidence >= self.HOLIDAY_CONFIDENCE:
+            return match.date
         else:
             return None
 
@@ -649,35 +1093,42 @@ class TimeSkill(MycroftSkill):
     def get_weekday(self, day=None, location=None):
         if not day:
             day = self.get_local_datetime(location)
-        return day.strftime("%A")
+        return self.formats.weekday(day)
 
     def get_month_date(self, day=None, location=None):
         if not day:
             day = self.get_local_datetime(location)
-        return day.strftime("%B %d")
+        return self.formats.month_date(day)
 
     def get_year(self, day=None, location=None):
         if not day:
             day = self.get_local_datetime(location)
-        return day.strftime("%Y")
+        return self.formats.year(day)
 
     def get_next_leap_year(self, year):
-        next_year = year + 1
-        if self.is_leap_year(next_year):
-            return next_year
-        else:
-            return self.get_next_leap_year(next_year)
+        return next_leap_year(year)
 
     def is_leap_year(self, year):
-        return (year % 400 == 0) or ((year % 4 == 0) and (year % 100 != 0))
+        return is_leap_year(year)
+
+    def get_local_today(self):
+        # Midnight of the current day in the device's timezone
+        return to_local(now_utc()).replace(hour=0, minute=0, second=0,
+                                           microsecond=0)
+
+    def get_date_without_year(self, day):
+        # Don't pass a `now` close to `day`, nice_date would answer
+        # "tomorrow" or "yesterday" instead of the date
+        return self.formats.spoken_date_without_year(
+            day, year_less_reference(day))
 
     def show_date_gui(self, location, day):
-        self.gui.clear()
-        self.gui['date_string'] = self.get_display_date(day, location)
-        self.gui['weekday_string'] = self.get_weekday(day, location)
-        self.gui['month_string'] = self.get_month_date(day, location)
-        self.gui['year_string'] = self.get_year(day, location)
-        self.gui.show_page('date.qml')
+        self.gui_state.show('date.qml', {
+            'date_string': self.get_display_date(day, location),
+            'weekday_string': self.get_weekday(day, location),
+            'month_string': self.get_month_date(day, location),
+            'year_string': self.get_year(day, location),
+        })
 
 
 def create_skill():
@@ -0,0 +1,82 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Small thread-safe caches shared by the skill's lookup paths. """
+
+import time
+from collections import OrderedDict
+from threading import Lock
+
+
+MISSING = object()
+
+
+class ResolutionCache:
+    """ Bounded LRU cache with a TTL and short-lived negative entries.
+
+    A value of None is a cached failure and expires after `negative_ttl`
+    seconds, so a misheard place is not looked up again on every query
+    but a later fix (e.g. a new index) is still picked up quickly.
+    """
+
+    def __init__(self, max_size=256, ttl=6 * 3600, negative_ttl=60,
+                 clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """ Get a cached value, MISSING if absent or expired. """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            if entry[0] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        ttl = self.negative_ttl if value is None else self.ttl
+        with self._lock:
+            self._entries[key] = (value, self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        return {'size': len(self._entries), 'hits': self.hits,
+                'negative_hits': self.negative_hits, 'misses': self.misses,
+                'evictions': self.evictions}
@@ -0,0 +1,110 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" City and timezone name index with near-miss suggestions. """
+
+from collections import defaultdict, namedtuple
+from threading import Lock
+
+from .gazetteer import closest_match, normalize_place, trigrams
+
+
+City = namedtuple('City', ['name', 'timezone'])
+
+
+# Zone cities that are no answer to a misheard place: research stations
+# ("Davis" for "Davos") and the sub-zones of a country or region
+_UNSUGGESTED_AREAS = ('Antarctica', 'Arctic', 'Etc')
+
+
+def astral_cities(geocoder):
+    """ (name, key, timezone, True) of every city in Astral's database. """
+    return [(location.name, normalize_place(location.name), location.timezone,
+             True)
+            for group in geocoder.groups.values() for location in group]
+
+
+def zone_cities(zone_names):
+    """ (city, key, zone, suggest) for zone names like
+    "America/Los_Angeles".
+    """
+    cities = []
+    for zone in zone_names:
+        if '/' in zone:
+            area, name = zone.split('/', 1)
+            suggest = area not in _UNSUGGESTED_AREAS and '/' not in name
+            name = zone.rsplit('/', 1)[1].replace('_', ' ')
+            cities.append((name, normalize_place(name), zone, suggest))
+    return cities
+
+
+class CityIndex:
+    """ Hashed index of city and timezone names, loaded on first use.
+
+    Earlier sources win for a name, so the translatable timezone.value
+    table can override a city of the same name. Names that are not
+    found can still get a suggestion from the closest indexed name
+    sharing trigrams with it, unless its source marked it as no
+    suggestion.
+
+    Arguments:
+        loader (callable): loader() -> iterable of (name, normalized name,
+                           timezone, suggest)
+    """
+    SUGGEST_CONFIDENCE = 0.8
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._lock = Lock()
+        self._loaded = False
+        self._cities = {}
+        self._postings = defaultdict(set)
+
+    def load(self):
+        """ Build the index, callers of lookup() wait for it to finish. """
+        with self._lock:
+            if self._loaded:
+                return
+            suggested = set()
+            for name, key, zone, suggest in self._loader():
+                if key and key not in self._cities:
+                    self._cities[key] = City(name, zone)
+                    if suggest:
+                        suggested.add(key)
+            for key in suggested:
+                for gram in trigrams(key):
+                    self._postings[gram].add(key)
+            self._loaded = True
+
+    def __len__(self):
+        return len(self._cities)
+
+    def lookup(self, name):
+        """ Get the City of an exact (normalized) name, None if unknown. """
+        if not self._loaded:
+            self.load()
+        return self._cities.get(normalize_place(name))
+
+    def suggest(self, name):
+        """ Get the closest City to a name that is not indexed, or None. """
+        if not self._loaded:
+            self.load()
+
+        key = normalize_place(name)
+        if not key or key in self._cities:
+            return None
+        confidence, match = closest_match(key, self._postings)
+        if confidence >= self.SUGGEST_CONFIDENCE:
+            return self._cities[match]
+        return None
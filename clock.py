@@ -0,0 +1,35 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Helpers for the minute-aligned clock tick. """
+
+import datetime
+from collections import namedtuple
+
+
+# Everything the GUI, Mark 1 and resting screen show, computed once a tick
+ClockState = namedtuple('ClockState', ['local', 'time_string', 'date_string',
+                                       'weekday_string', 'month_string',
+                                       'year_string'])
+
+
+def next_minute(now=None):
+    """ Get the start of the next minute after `now` (default: now).
+
+    UTC offsets (and so DST switches) are whole minutes, so waking on the
+    minute catches every change of the displayed time in any zone.
+    """
+    now = now or datetime.datetime.now()
+    return now.replace(second=0, microsecond=0) + \
+        datetime.timedelta(minutes=1)
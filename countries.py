@@ -0,0 +1,117 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Country name to ISO 3166-1 alpha-2 code resolution. """
+
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock
+
+from .gazetteer import closest_match, normalize_place, trigrams
+
+
+# "the", "republic of", "federal republic of the" ... in front of a name
+_PREFIX = re.compile(r'^(the )?((\w+ )*?(republic|kingdom|state|principality'
+                     r'|commonwealth|federation|sultanate|grand duchy) of )?'
+                     r'(the )?')
+
+
+def strip_prefix(key):
+    """ Drop articles and "republic of" style prefixes of a normalized name.
+    """
+    return _PREFIX.sub('', key, count=1) or key
+
+
+class CountryIndex:
+    """ Multilingual country name index, loaded on first use.
+
+    Lookups try the normalized name, then the name without its prefix
+    ("republic of ..."), then a unique prefix ("united kingd") and finally
+    the closest name sharing trigrams with it.
+
+    Short words are too close to unrelated places ("lagos", "roman") to
+    be completed or corrected, and two-letter codes ("ne") only match
+    exactly. A name that merely extends a country ("indiana") is not a
+    misspelling of it either.
+
+    Arguments:
+        loader (callable): loader() -> iterable of (normalized name, code)
+    """
+    FUZZY_CONFIDENCE = 0.8
+    MIN_MATCH_LENGTH = 6
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._lock = Lock()
+        self._loaded = False
+        self._names = {}
+        self._stripped = {}
+        self._sorted = []
+        self._postings = defaultdict(set)
+
+    def load(self):
+        """ Build the index, callers of lookup() wait for it to finish. """
+        with self._lock:
+            if self._loaded:
+                return
+            stripped = defaultdict(set)
+            for key, code in self._loader():
+                if not key:
+                    continue
+                self._names.setdefault(key, code)
+                stripped[strip_prefix(key)].add(code)
+            # "korea" could be either Korea, so keep unambiguous ones only
+            self._stripped = {key: codes.pop()
+                              for key, codes in stripped.items()
+                              if len(codes) == 1}
+            # Two-letter codes are too short to be completed or corrected
+            names = [key for key in self._names if len(key) > 2]
+            self._sorted = sorted(names)
+            for key in names:
+                for gram in trigrams(key):
+                    self._postings[gram].add(key)
+            self._loaded = True
+
+    def lookup(self, country_string):
+        """ Get the country code of a name, None if unknown. """
+        if not self._loaded:
+            self.load()
+
+        key = normalize_place(country_string)
+        if not key:
+            return None
+        if key in self._names:
+            return self._names[key]
+        stripped = strip_prefix(key)
+        if stripped in self._stripped:
+            return self._stripped[stripped]
+        if len(key) < self.MIN_MATCH_LENGTH:
+            return None
+        return self._prefix_match(key) or self._fuzzy_match(key)
+
+    def _prefix_match(self, key):
+        pos = bisect_left(self._sorted, key)
+        codes = set()
+        while pos < len(self._sorted) and \
+                self._sorted[pos].startswith(key) and len(codes) < 2:
+            codes.add(self._names[self._sorted[pos]])
+            pos += 1
+        return codes.pop() if len(codes) == 1 else None
+
+    def _fuzzy_match(self, key):
+        confidence, match = closest_match(key, self._postings)
+        if confidence >= self.FUZZY_CONFIDENCE and not key.startswith(match):
+            return self._names[match]
+        return None
@@ -0,0 +1,77 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Closed-form calendar arithmetic for the date queries. """
+
+import datetime
+
+
+SATURDAY = 5
+
+
+def next_weekend(today):
+    """ Get the Saturday and Sunday that "this weekend" refers to.
+
+    Same answer as extract_datetime('this saturday') / ('this sunday'):
+    on a Sunday that is the coming weekend, on a Saturday the current one.
+    """
+    saturday = today + datetime.timedelta(days=(SATURDAY - today.weekday())
+                                          % 7)
+    return saturday, saturday + datetime.timedelta(days=1)
+
+
+def last_weekend(today):
+    """ Get the Saturday and Sunday that "last weekend" refers to. """
+    saturday, sunday = next_weekend(today)
+    week = datetime.timedelta(days=7)
+    return saturday - week, sunday - week
+
+
+def is_leap_year(year):
+    return (year % 400 == 0) or ((year % 4 == 0) and (year % 100 != 0))
+
+
+def next_leap_year(year):
+    """ Get the first leap year after `year`. """
+    # Next multiple of 4, skipping at most one century year in a row
+    candidate = year + 4 - year % 4
+    while not is_leap_year(candidate):
+        candidate += 4
+    return candidate
+
+
+def next_leap_years(year, count):
+    """ Get the first `count` leap years after `year`. """
+    years = []
+    while len(years) < count:
+        year = next_leap_year(year)
+        years.append(year)
+    return years
+
+
+def days_until(day, today):
+    """ Days from `today` to `day` (negative when it is in the past). """
+    return day.toordinal() - today.toordinal()
+
+
+def year_less_reference(day):
+    """ Get a `now` for nice_date that makes it leave out the year.
+
+    nice_date drops the year for a date in the same year as `now`, but
+    says "today"/"tomorrow" or drops the month for dates close to it, so
+    the reference is always another month of the same year.
+    """
+    if day.month > 2:
+        return day - datetime.timedelta(days=40)
+    return day + datetime.timedelta(days=40)
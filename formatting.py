@@ -0,0 +1,115 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Memoized time and date strings.
+
+A formatted time only depends on the minute of the day and the language
+and clock settings, a formatted date only on the day and the settings, so
+each string is rendered once and then served from a table until the
+settings change.
+"""
+
+import datetime
+from threading import Lock
+
+
+class FormatCache:
+    """ Tables of formatted strings for one (lang, 24h, date format).
+
+    Arguments:
+        nice_time (callable): mycroft.util.format.nice_time
+        nice_date (callable): mycroft.util.format.nice_date
+        max_dates (int): day strings kept before the date tables restart
+    """
+
+    def __init__(self, nice_time, nice_date, max_dates=400):
+        self._nice_time = nice_time
+        self._nice_date = nice_date
+        self.max_dates = max_dates
+        self.settings = None
+        self._times = {}
+        self._dates = {}
+        self._lock = Lock()
+
+    def configure(self, lang, use_24hour, date_format):
+        """ Switch to new settings, dropping every table if they changed. """
+        settings = (lang, use_24hour, date_format)
+        if settings != self.settings:
+            with self._lock:
+                self.settings = settings
+                self._times = {}
+                self._dates = {}
+
+    def _time(self, dt, speech, use_ampm):
+        key = (dt.hour, dt.minute, speech, use_ampm)
+        s = self._times.get(key)
+        if s is None:
+            lang, use_24hour, _ = self.settings
+            s = self._nice_time(dt, lang, speech=speech,
+                                use_24hour=use_24hour, use_ampm=use_ampm)
+            self._times[key] = s
+        return s
+
+    def display_time(self, dt):
+        """ Digital clock time, like nice_time(speech=False). """
+        return self._time(dt, False, False)
+
+    def spoken_time(self, dt, use_ampm=False):
+        """ Spoken time, like nice_time(speech=True). """
+        return self._time(dt, True, use_ampm)
+
+    def precompute_display_times(self):
+        """ Fill the digital clock table for all 1440 minutes of a day. """
+        midnight = datetime.datetime(2000, 1, 1)
+        for minute in range(24 * 60):
+            self.display_time(midnight + datetime.timedelta(minutes=minute))
+
+    def _date(self, kind, day, render):
+        key = (kind, day.year, day.month, day.day)
+        s = self._dates.get(key)
+        if s is None:
+            if len(self._dates) >= self.max_dates:
+                self._dates = {}
+            s = self._dates[key] = render()
+        return s
+
+    def display_date(self, day):
+        """ Numeric date in the configured order (MDY or YDM). """
+        if self.settings[2] == 'MDY':
+            return self._date('display', day,
+                              lambda: day.strftime("%-m/%-d/%Y"))
+        return self._date('display', day, lambda: day.strftime("%Y/%-d/%-m"))
+
+    def weekday(self, day):
+        return self._date('weekday', day, lambda: day.strftime("%A"))
+
+    def month_date(self, day):
+        return self._date('month', day, lambda: day.strftime("%B %d"))
+
+    def year(self, day):
+        return self._date('year', day, lambda: day.strftime("%Y"))
+
+    def spoken_date(self, day):
+        """ Full spoken date, like nice_date() without a `now`. """
+        return self._date('spoken', day,
+                          lambda: self._nice_date(day,
+                                                  lang=self.settings[0]))
+
+    def spoken_date_without_year(self, day, now):
+        """ Spoken date without the year, `now` must only depend on `day`
+        (see dates.year_less_reference).
+        """
+        return self._date('no_year', day,
+                          lambda: self._nice_date(day, lang=self.settings[0],
+                                                  now=now))
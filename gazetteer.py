@@ -0,0 +1,210 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Offline place-name index used to resolve locations without Geonames.
+
+The index is a plain UTF-8 file with one place per line:
+
+    <normalized name>\t<display name>\t<country code>\t<timezone>\t<lat>\t<lng>
+
+Lines are sorted by the encoded normalized name (most populated place
+first for duplicate names), so a lookup is a binary search over the
+memory-mapped file and never needs to load the whole index.
+
+Build it from a GeoNames dump (e.g. cities15000.txt) with:
+
+    python gazetteer.py cities15000.txt gazetteer.idx
+"""
+
+import mmap
+import os
+import re
+import sys
+import unicodedata
+from collections import defaultdict, namedtuple
+from difflib import SequenceMatcher
+
+
+Place = namedtuple('Place', ['name', 'country', 'timezone', 'lat', 'lng'])
+
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def normalize_place(name):
+    """ Normalize a place name for index lookups.
+
+    Accents are stripped, case is folded and punctuation collapsed into
+    single spaces, so "São Paulo" and "sao-paulo" share a key.
+    """
+    name = unicodedata.normalize('NFKD', str(name))
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    return _NON_WORD.sub(' ', name.casefold()).strip()
+
+
+def trigrams(text):
+    """ Get the set of character trigrams of a (normalized) name. """
+    padded = '  {} '.format(text)
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _ratio(key, candidate):
+    return SequenceMatcher(None, key, candidate).ratio()
+
+
+def closest_match(key, postings, score=_ratio, candidates=8):
+    """ Find the indexed entry closest to a name that isn't indexed.
+
+    The entries sharing the most trigrams with `key` are scored, by
+    default with the SequenceMatcher ratio of the two names.
+
+    Arguments:
+        key (str): normalized name
+        postings (dict): trigram -> set of entries
+        score (callable): score(key, entry) -> float between 0 and 1
+        candidates (int): entries scored
+
+    Returns:
+        tuple: (confidence, entry), (0.0, None) if no trigram is shared
+    """
+    shared = defaultdict(int)
+    for gram in trigrams(key):
+        for candidate in postings.get(gram, ()):
+            shared[candidate] += 1
+    best = sorted(shared, key=shared.get, reverse=True)[:candidates]
+    if not best:
+        return 0.0, None
+    return max((score(key, candidate), candidate) for candidate in best)
+
+
+class Gazetteer:
+    """ Read-only, lazily memory-mapped place-name index. """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._map = None
+
+    @property
+    def available(self):
+        return self._open() is not None
+
+    def _open(self):
+        if self._map is None and os.path.isfile(self.path):
+            f = open(self.path, 'rb')
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._file = f
+            except ValueError:
+                # mmap refuses empty files
+                f.close()
+        return self._map
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = None
+        self._file = None
+
+    def _first_at_or_after(self, mm, key):
+        # Binary search over line starts for the first line >= key
+        lo, hi = 0, len(mm)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mm.rfind(b'\n', 0, mid) + 1
+            end = mm.find(b'\n', start)
+            if end == -1:
+                end = len(mm)
+            if mm[start:mm.find(b'\t', start, end)] < key:
+                lo = end + 1
+            else:
+                hi = start
+        return lo
+
+    def _read(self, mm, pos):
+        end = mm.find(b'\n', pos)
+        if end == -1:
+            end = len(mm)
+        return mm[pos:end].decode('utf-8').split('\t'), end + 1
+
+    def lookup(self, name):
+        """ Find the best known place for a name.
+
+        Returns:
+            Place: the most populated place with that name, None if unknown
+        """
+        places = self.lookup_all(name, limit=1)
+        return places[0] if places else None
+
+    def lookup_all(self, name, limit=None):
+        """ Find every place sharing a name, most populated first. """
+        mm = self._open()
+        key = normalize_place(name)
+        if mm is None or not key:
+            return []
+
+        encoded = key.encode('utf-8')
+        pos = self._first_at_or_after(mm, encoded)
+        places = []
+        while pos < len(mm) and (limit is None or len(places) < limit):
+            fields, pos = self._read(mm, pos)
+            if len(fields) < 6 or fields[0] != key:
+                break
+            places.append(Place(fields[1], fields[2], fields[3],
+                                float(fields[4]), float(fields[5])))
+        return places
+
+
+def build_index(source, dest, min_population=0):
+    """ Build a gazetteer index from a GeoNames cities dump.
+
+    Arguments:
+        source (str): path to a GeoNames citiesNNNN.txt file
+        dest (str): path of the index file to write
+        min_population (int): skip places smaller than this
+    """
+    rows = {}
+    with open(source, encoding='utf-8') as f:
+        for line in f:
+            cols = line.rstrip('\n').split('\t')
+            if len(cols) < 18 or not cols[17]:
+                continue
+            population = int(cols[14] or 0)
+            if population < min_population:
+                continue
+            name, country, timezone = cols[1], cols[8], cols[17]
+            names = {cols[1], cols[2]}
+            names.update(n for n in cols[3].split(',') if n)
+            for alias in names:
+                key = normalize_place(alias)
+                if not key:
+                    continue
+                entry = (population, name, country, timezone, cols[4], cols[5])
+                # Aliases often normalize to the same key, keep one per place
+                rows.setdefault(key, {})[cols[0]] = entry
+
+    tmp = dest + '.tmp'
+    with open(tmp, 'wb') as out:
+        for key in sorted(rows, key=lambda k: k.encode('utf-8')):
+            for entry in sorted(rows[key].values(), key=lambda e: -e[0]):
+                line = '\t'.join((key,) + entry[1:]) + '\n'
+                out.write(line.encode('utf-8'))
+    os.replace(tmp, dest)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print('usage: gazetteer.py <geonames cities dump> <index file>')
+        sys.exit(1)
+    build_index(sys.argv[1], sys.argv[2])
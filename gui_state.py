@@ -0,0 +1,93 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" GUI session updates that only send what changed. """
+
+from threading import Lock
+
+from mycroft.messagebus.message import Message
+
+
+_UNSET = object()
+
+
+class GuiState:
+    """ Last values and page pushed to the skill's GUI session.
+
+    SkillGUI sends the whole session on the bus for every key set while a
+    page is shown. Here unchanged keys are skipped, changed keys go out in
+    a single gui.value.set and a page is only shown when it changes.
+
+    Arguments:
+        gui (SkillGUI): the skill's GUI interface
+        emit (callable): bus emit
+        namespace (str): the skill id, the GUI namespace of the values
+    """
+
+    def __init__(self, gui, emit, namespace):
+        self.gui = gui
+        self._emit = emit
+        self.namespace = namespace
+        self.page = None
+        self.values = {}
+        self._lock = Lock()
+        self.updates = 0
+
+    def _changed(self, values):
+        return {key: value for key, value in values.items()
+                if self.values.get(key, _UNSET) != value}
+
+    def _write(self, changed, send):
+        if len(changed) > 1 or not send:
+            # Keep SkillGUI's session data complete (show_page sends it)
+            # without one bus message per key
+            page, self.gui.page = self.gui.page, None
+            try:
+                for key, value in changed.items():
+                    self.gui[key] = value
+            finally:
+                self.gui.page = page
+            if send and page:
+                data = dict(changed)
+                data['__from'] = self.namespace
+                self._emit(Message('gui.value.set', data))
+        else:
+            for key, value in changed.items():
+                self.gui[key] = value
+        self.values.update(changed)
+        self.updates += 1
+
+    def update(self, values):
+        """ Send the keys of `values` that differ from the last ones. """
+        with self._lock:
+            changed = self._changed(values)
+            if changed:
+                self._write(changed, send=True)
+
+    def show(self, page, values, force=False):
+        """ Update values and show `page` if it isn't the active one. """
+        with self._lock:
+            switch = force or page != self.page
+            changed = self._changed(values)
+            if changed:
+                # Showing a page sends the session data along with it
+                self._write(changed, send=not switch)
+            if switch:
+                self.gui.show_page(page)
+                self.page = page
+
+    def invalidate(self):
+        """ Forget the active page, e.g. after another skill took over. """
+        with self._lock:
+            self.page = None
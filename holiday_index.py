@@ -0,0 +1,152 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Fuzzy search index over the holidays of one country. """
+
+import datetime
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from difflib import SequenceMatcher
+
+from .gazetteer import closest_match, normalize_place, trigrams
+
+
+HolidayMatch = namedtuple('HolidayMatch', ['name', 'date', 'confidence'])
+
+
+def normalize_holiday(name):
+    # "New Year's Day" and "new years day" should share a key
+    return normalize_place(str(name).replace("'", '').replace('’', ''))
+
+
+class HolidayIndex:
+    """ Trigram index from holiday names and aliases to their dates.
+
+    Candidates sharing the most trigrams with the query are scored with the
+    same ratio `match_one` uses, so confidences stay comparable, but only a
+    handful of names are scored no matter how many are indexed.
+
+    Next occurrences are kept in a table for `today`. advance() moves it
+    to a new day, only looking up holidays whose date has passed.
+    """
+    CANDIDATES = 8
+
+    def __init__(self, holidays_by_year=None):
+        self.years = set()
+        self._names = []         # display name per id
+        self._keys = []          # normalized key per id
+        self._dates = []         # sorted dates per id
+        self._ids = {}           # normalized key -> id
+        self._aliases = defaultdict(list)   # id -> alias keys
+        self._postings = defaultdict(set)
+        self.today = None
+        self._next = []          # next date on or after today per id
+        for year, holidays in (holidays_by_year or {}).items():
+            self.add_year(year, holidays)
+
+    def _id_for(self, key, name):
+        if key not in self._ids:
+            self._ids[key] = len(self._keys)
+            self._names.append(name)
+            self._keys.append(key)
+            self._dates.append([])
+            self._next.append(None)
+            for gram in trigrams(key):
+                self._postings[gram].add(self._ids[key])
+        return self._ids[key]
+
+    def add_year(self, year, holidays):
+        """ Index a year of holidays ({'name': ..., 'date': ...} dicts). """
+        for holiday in holidays:
+            key = normalize_holiday(holiday['name'])
+            if not key:
+                continue
+            date = datetime.datetime.strptime(holiday['date'],
+                                              '%Y-%m-%d').date()
+            hid = self._id_for(key, holiday['name'])
+            dates = self._dates[hid]
+            if date not in dates:
+                dates.insert(bisect_left(dates, date), date)
+            if self.today is not None:
+                self._next[hid] = self._next_date(hid, self.today)
+        self.years.add(year)
+
+    def _next_date(self, hid, after):
+        dates = self._dates[hid]
+        pos = bisect_left(dates, after)
+        return dates[pos] if pos < len(dates) else None
+
+    def advance(self, today):
+        """ Move the next-occurrence table to `today`. """
+        if self.today is not None and today >= self.today:
+            for hid, date in enumerate(self._next):
+                if date is None or date < today:
+                    self._next[hid] = self._next_date(hid, today)
+        else:
+            self._next = [self._next_date(hid, today)
+                          for hid in range(len(self._dates))]
+        self.today = today
+
+    def add_alias(self, alias, name):
+        """ Make `alias` (e.g. "xmas") find the holiday called `name`.
+
+        Returns:
+            bool: False if no indexed holiday is called `name`
+        """
+        target = self._ids.get(normalize_holiday(name))
+        key = normalize_holiday(alias)
+        if target is None:
+            return False
+        if not key or key in self._ids:
+            return True
+        self._ids[key] = target
+        for gram in trigrams(key):
+            self._postings[gram].add(target)
+        self._aliases[target].append(key)
+        return True
+
+    def _score(self, key, hid):
+        keys = [self._keys[hid]] + self._aliases.get(hid, [])
+        return max(SequenceMatcher(None, key, k).ratio() for k in keys)
+
+    def find(self, holiday_string, after=None):
+        """ Find the best matching holiday and its next occurrence.
+
+        Arguments:
+            holiday_string (str): holiday as spoken by the user
+            after (date): first acceptable date, defaults to today (the
+                          table's day if it was advanced)
+
+        Returns:
+            HolidayMatch: best match (date None if none is left in the
+                          indexed years), or None when nothing is indexed
+        """
+        key = normalize_holiday(holiday_string)
+        after = after or self.today or datetime.date.today()
+        if not key or not self._keys:
+            return None
+
+        if key in self._ids:
+            hid, confidence = self._ids[key], 1.0
+        else:
+            confidence, hid = closest_match(key, self._postings,
+                                            self._score, self.CANDIDATES)
+            if hid is None:
+                return HolidayMatch(None, None, 0.0)
+
+        if after == self.today:
+            date = self._next[hid]
+        else:
+            date = self._next_date(hid, after)
+        return HolidayMatch(self._names[hid], date, confidence)
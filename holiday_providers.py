@@ -0,0 +1,121 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Sources for the holiday tables of a country and year.
+
+Every provider returns a list of holidays sorted by date, each one a dict
+with a 'name' and an ISO 'date' ("YYYY-MM-DD"), the format the Holiday
+API uses.
+"""
+
+import re
+
+from .http_client import HttpClient, ServiceUnavailable
+from .startup import lazy_import
+
+
+HOLIDAY_API_URL = 'https://holidayapi.com/v1/holidays'
+
+# Older `holidays` releases join the names sharing a date with ", ",
+# newer ones with "; "
+_JOINED_NAMES = re.compile(r'[;,] ')
+
+
+class HolidayProvider:
+    """ Base class for holiday sources. """
+    name = None
+
+    def holidays(self, country_code, year):
+        """ Get the holidays of a country for a year.
+
+        Arguments:
+            country_code (str): ISO 3166-1 alpha-2 code, e.g. "US"
+            year (int): year to list
+
+        Returns:
+            list: dicts with 'name' and 'date', empty if unknown
+        """
+        raise NotImplementedError
+
+
+class LocalHolidayProvider(HolidayProvider):
+    """ Generates holiday tables offline with the `holidays` package.
+
+    Names are asked for in English, like the Holiday API gives them and
+    holidays.value expects them. Countries without English names (or an
+    old package without the `language` argument) use their own language.
+    """
+    name = 'local'
+    language = 'en_US'
+
+    def __init__(self, report=None):
+        self.report = report
+
+    def holidays(self, country_code, year):
+        # Only imported once a holiday is asked for, it is slow to load
+        package = lazy_import('holidays', self.report)
+        factory = getattr(package, 'country_holidays', None) or \
+            package.CountryHoliday
+        try:
+            try:
+                table = factory(country_code.upper(), years=year,
+                                language=self.language)
+            except TypeError:
+                table = factory(country_code.upper(), years=year)
+        except (KeyError, NotImplementedError, AttributeError):
+            return []  # country not covered by the package
+
+        get_list = getattr(table, 'get_list', None)
+        result = []
+        for day, names in sorted(table.items()):
+            # Holidays sharing a date come back joined as one name
+            names = get_list(day) if get_list else _JOINED_NAMES.split(names)
+            for name in names:
+                result.append({'name': name, 'date': day.isoformat()})
+        return result
+
+
+class HolidayApiProvider(HolidayProvider):
+    """ Fetches holiday tables from holidayapi.com (or a compatible URL). """
+    name = 'holidayapi'
+
+    def __init__(self, key, url=None, http=None):
+        self.key = key
+        self.url = url or HOLIDAY_API_URL
+        self.http = http or HttpClient()
+
+    def holidays(self, country_code, year):
+        parameters = {
+            'key':      self.key,
+            'country':  country_code,
+            'year':     year,
+        }
+        # Raises ServiceUnavailable when the API can't be reached in time
+        result = self.http.get_json(self.url, parameters)
+        # Errors (bad key, quota) come back as a JSON body, don't mistake
+        # them for a year without holidays
+        if not isinstance(result, dict) or result.get('status') != 200 or \
+                'holidays' not in result:
+            raise ServiceUnavailable('{}: {}'.format(
+                self.url, result.get('error') if isinstance(result, dict)
+                else 'unexpected response'))
+        return result['holidays']
+
+
+def create_provider(settings, http=None, report=None):
+    """ Create the holiday provider selected in the skill settings. """
+    if settings.get('holiday_provider') == HolidayApiProvider.name:
+        return HolidayApiProvider(settings.get('holiday_api_key'),
+                                  settings.get('holiday_api_url'), http)
+    return LocalHolidayProvider(report)
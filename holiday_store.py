@@ -0,0 +1,76 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" SQLite store keeping holiday tables across skill reloads. """
+
+import json
+import sqlite3
+import time
+from threading import Lock
+
+
+class HolidayStore:
+    """ Holiday tables per provider, country and year, expiring by age.
+
+    Arguments:
+        path (str): database file
+        max_age (float): seconds before a stored table is fetched again
+    """
+    # 2: local tables are stored with English names
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path, max_age=30 * 24 * 3600):
+        self.path = path
+        self.max_age = max_age
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._migrate()
+
+    def _migrate(self):
+        with self._lock, self._db:
+            version = self._db.execute('PRAGMA user_version').fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                # Only a cache, so an old layout is simply dropped
+                self._db.execute('DROP TABLE IF EXISTS holidays')
+                self._db.execute('PRAGMA user_version = {}'.format(
+                    self.SCHEMA_VERSION))
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS holidays ('
+                ' provider TEXT, country TEXT, year INTEGER,'
+                ' fetched REAL, data TEXT,'
+                ' PRIMARY KEY (provider, country, year))')
+            self._db.execute('DELETE FROM holidays WHERE fetched < ?',
+                             (time.time() - self.max_age,))
+
+    def get(self, provider, country_code, year):
+        """ Get a stored table, None if missing or expired. """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT fetched, data FROM holidays'
+                ' WHERE provider = ? AND country = ? AND year = ?',
+                (provider, country_code, year)).fetchone()
+        if row is None or row[0] < time.time() - self.max_age:
+            return None
+        return json.loads(row[1])
+
+    def put(self, provider, country_code, year, holidays):
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO holidays VALUES (?, ?, ?, ?, ?)',
+                (provider, country_code, year, time.time(),
+                 json.dumps(holidays)))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,175 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Shared outbound HTTP layer for the Geonames and Holiday API calls.
+
+Every request goes through a keep-alive session, gets a hard deadline and
+a few retries with capped exponential backoff. A circuit breaker per host
+fails fast while a service keeps failing, and identical requests made at
+the same time share a single round trip.
+"""
+
+import time
+from threading import Event, Lock
+from urllib.parse import urlsplit
+
+import requests
+
+
+class ServiceUnavailable(Exception):
+    """ A request failed, timed out or its circuit is open. """
+
+
+class CircuitBreaker:
+    """ Opens after `threshold` consecutive failures for `cooldown` seconds.
+
+    Once the cooldown passes one trial request is let through; success
+    closes the circuit, another failure opens it again.
+    """
+
+    def __init__(self, threshold=5, cooldown=30.0, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._failures = 0
+        self._opened = None
+
+    @property
+    def is_open(self):
+        if self._opened is None:
+            return False
+        if self._clock() - self._opened >= self.cooldown:
+            return False  # half open, allow a trial request
+        return True
+
+    def success(self):
+        self._failures = 0
+        self._opened = None
+
+    def failure(self):
+        self._failures += 1
+        if self._failures >= self.threshold:
+            self._opened = self._clock()
+
+
+class _Call:
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class HttpClient:
+    """ GET requests with deadlines, retries, circuit breaking and
+    single-flight coalescing.
+
+    Arguments:
+        timeout (float): per-attempt socket timeout in seconds
+        deadline (float): total time budget of one get() in seconds
+        retries (int): attempts after the first one
+        backoff (float): first retry delay, doubled on each retry
+        max_backoff (float): upper bound of a retry delay
+    """
+
+    def __init__(self, timeout=3.0, deadline=8.0, retries=3, backoff=0.25,
+                 max_backoff=2.0, breaker_threshold=5, breaker_cooldown=30.0,
+                 session=None, sleep=time.sleep, clock=time.monotonic):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.session = session or requests.Session()
+        self._sleep = sleep
+        self._clock = clock
+        self._breakers = {}
+        self._in_flight = {}
+        self._lock = Lock()
+
+    def breaker(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.breaker_threshold,
+                                                      self.breaker_cooldown,
+                                                      self._clock)
+            return self._breakers[host]
+
+    def get_json(self, url, params=None):
+        """ GET a URL and decode its JSON body.
+
+        Concurrent calls with the same url and params wait for the first
+        one and share its result.
+
+        Raises:
+            ServiceUnavailable: when no attempt succeeded in time
+        """
+        key = (url, tuple(sorted((params or {}).items())))
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+
+        if not leader:
+            call.done.wait(self.deadline)
+            if not call.done.is_set():
+                raise ServiceUnavailable('{}: deadline exceeded'.format(url))
+            if call.error:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._get_json(url, params)
+        except ServiceUnavailable as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+        return call.result
+
+    def _get_json(self, url, params):
+        breaker = self.breaker(url)
+        if breaker.is_open:
+            raise ServiceUnavailable('{}: circuit open'.format(url))
+
+        end = self._clock() + self.deadline
+        delay = self.backoff
+        error = None
+        for attempt in range(self.retries + 1):
+            remaining = end - self._clock()
+            if remaining <= 0:
+                break
+            try:
+                response = self.session.get(
+                    url, params=params, timeout=min(self.timeout, remaining))
+                if response.status_code >= 500:
+                    raise requests.HTTPError(
+                        'server error {}'.format(response.status_code))
+                result = response.json()
+                breaker.success()
+                return result
+            except (requests.RequestException, ValueError) as e:
+                error = e
+                breaker.failure()
+                if breaker.is_open:
+                    break
+            if attempt < self.retries:
+                self._sleep(max(0, min(delay, end - self._clock())))
+                delay = min(delay * 2, self.max_backoff)
+        raise ServiceUnavailable('{}: {}'.format(url, error or 'deadline'))
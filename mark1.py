@@ -0,0 +1,74 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Mark 1 faceplate rendering.
+
+An img_code is a width character ('A' + columns), a height character
+('A' + rows) and then two characters per column, each one encoding four
+pixels as 'A' + bits. Because columns are independent, a full 32x8 frame
+is just the glyph columns laid side by side.
+"""
+
+from functools import lru_cache
+
+
+WIDTH = 32
+HEIGHT = 8
+BLANK_COLUMN = 'AA'
+
+# Column data for the display encoding of a Mark 1
+# (4x8 including a blank spacer column, except colon, which is 2x8)
+GLYPHS = {
+    ':': 'ICAA',
+    '0': 'MHEEMHAA',
+    '1': 'IEMHAEAA',
+    '2': 'EHEFMFAA',
+    '3': 'EFEFMHAA',
+    '4': 'MBABMHAA',
+    '5': 'MFEFEHAA',
+    '6': 'MHEFEHAA',
+    '7': 'EAEAMHAA',
+    '8': 'MHEFMHAA',
+    '9': 'MBEBMHAA',
+}
+
+ALARM_X = 29
+ALARM_DOT = ['AA', 'CA']    # a dot in the upper-right corner
+
+
+def _columns(code):
+    return [code[i:i + 2] for i in range(0, len(code), 2)]
+
+
+@lru_cache(maxsize=2 * 24 * 60)
+def render_time(display_time, alarm_set=False):
+    """ Render a time like "12:34" as one full-width img_code.
+
+    Frames are cached, so every minute costs a single lookup.
+    """
+    columns = [BLANK_COLUMN] * WIDTH
+
+    # draw the time, centered on display
+    x = (WIDTH - (4 * len(display_time) - 2)) // 2
+    for c in display_time:
+        if c in GLYPHS:
+            for column in _columns(GLYPHS[c]):
+                if 0 <= x < WIDTH:
+                    columns[x] = column
+                x += 1
+
+    if alarm_set:
+        columns[ALARM_X:ALARM_X + len(ALARM_DOT)] = ALARM_DOT
+
+    return chr(ord('A') + WIDTH) + chr(ord('A') + HEIGHT) + ''.join(columns)
@@ -0,0 +1,115 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" In-process latency histograms for the skill's hot path stages. """
+
+import time
+from bisect import bisect_left
+from threading import Lock
+
+
+# Upper bounds of the histogram buckets, in milliseconds
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, float('inf'))
+
+
+class Histogram:
+    """ Fixed-bucket latency histogram. """
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'max_ms': self.max_ms,
+            'buckets': {('+inf' if b == float('inf') else str(b)): c
+                        for b, c in zip(BUCKETS_MS, self.counts)},
+        }
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage,
+                             (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class Metrics:
+    """ Timing spans per stage, cheap to leave in when disabled.
+
+    With `enabled` False a span is a shared no-op context manager, so the
+    instrumented code pays one attribute check and nothing else.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self._lock = Lock()
+
+    def span(self, stage):
+        """ Time a `with` block as one sample of `stage`. """
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, stage)
+
+    def observe(self, stage, ms):
+        if not self.enabled:
+            return
+        with self._lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram()
+            self.histograms[stage].add(ms)
+
+    def snapshot(self, counters=None):
+        """ Get all histograms, and the given counters, as JSON-able data.
+        """
+        with self._lock:
+            stages = {stage: h.to_dict()
+                      for stage, h in self.histograms.items()}
+        return {'stages': stages, 'counters': dict(counters or {})}
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
@@ -1,3 +1,17 @@
 if grep -q '"platform":.*"mycroft_mark_.*"' /etc/mycroft/mycroft.conf; then
     sudo apt-get install --force-yes -yq libgeos-dev -o DPkg::Options::=--force-confdef
-fi
\ No newline at end of file
+fi
+
+# Build the offline place index used instead of Geonames lookups
+SKILL_DIR="$(cd "$(dirname "$0")" && pwd)"
+if [ ! -f "$SKILL_DIR/gazetteer.idx" ]; then
+    TMP_DIR="$(mktemp -d)"
+    if wget -q -O "$TMP_DIR/cities.zip" https://download.geonames.org/export/dump/cities15000.zip &&
+            unzip -q -o "$TMP_DIR/cities.zip" -d "$TMP_DIR"; then
+        python3 "$SKILL_DIR/gazetteer.py" "$TMP_DIR/cities15000.txt" "$SKILL_DIR/gazetteer.idx"
+    fi
+    rm -rf "$TMP_DIR"
+fi
+
+# Compile the per-language .value tables and regexes
+python3 "$SKILL_DIR/resources.py" "$SKILL_DIR"
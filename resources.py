@@ -0,0 +1,237 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Compiled per-language resource bundles.
+
+A bundle holds a language's dialog/<lang>/*.value tables, with keys
+already normalized, and its regex/<lang>/*.rx patterns, already checked,
+in a single pickle. It records the mtime and size of every source file
+and is rebuilt when any of them changes. Build all bundles ahead of time
+with:
+
+    python resources.py <skill directory>
+"""
+
+import glob
+import os
+import pickle
+import re
+import sys
+import time
+from collections import namedtuple
+from threading import Lock
+
+if __package__:
+    from .gazetteer import normalize_place
+else:  # run as a build script
+    from gazetteer import normalize_place
+
+
+BUNDLE_VERSION = 1
+
+# name: as written, key: normalize_place(name), value: text after the comma
+NamedValue = namedtuple('NamedValue', ['name', 'key', 'value'])
+
+
+def read_values(path):
+    """ Read a .value file as (name, key, value) tuples. """
+    values = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or ',' not in line:
+                continue
+            name, value = line.rsplit(',', 1)
+            name = name.strip()
+            values.append((name, normalize_place(name), value.strip()))
+    return values
+
+
+def read_pattern_sources(path):
+    """ Read the valid patterns of an .rx file, skipping comments. """
+    patterns = []
+    with open(path, encoding='utf-8') as f:
+        for pat in f.read().splitlines():
+            pat = pat.strip()
+            if not pat or pat[0] == "#":
+                continue
+            try:
+                re.compile(pat)
+            except re.error:
+                continue  # a broken translation shouldn't break the others
+            patterns.append(pat)
+    return patterns
+
+
+def source_stamps(root_dir, lang):
+    """ (mtime, size) of every resource file of a language. """
+    paths = glob.glob(os.path.join(root_dir, 'dialog', lang, '*.value')) + \
+        glob.glob(os.path.join(root_dir, 'regex', lang, '*.rx'))
+    stamps = {}
+    for path in sorted(paths):
+        st = os.stat(path)
+        stamps[os.path.relpath(path, root_dir)] = (st.st_mtime_ns, st.st_size)
+    return stamps
+
+
+def compile_bundle(root_dir, lang):
+    """ Read a language's resources into bundle data. """
+    sources = source_stamps(root_dir, lang)
+    values = {}
+    regexes = {}
+    for rel in sources:
+        path = os.path.join(root_dir, rel)
+        name, ext = os.path.splitext(os.path.basename(rel))
+        if ext == '.value':
+            values[name] = read_values(path)
+        else:
+            regexes[name + ext] = read_pattern_sources(path)
+    return {'version': BUNDLE_VERSION, 'lang': lang, 'sources': sources,
+            'values': values, 'regex': regexes}
+
+
+def write_bundle(data, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def read_bundle(path):
+    """ Get bundle data, None if missing, unreadable or outdated. """
+    try:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    if not isinstance(data, dict) or data.get('version') != BUNDLE_VERSION:
+        return None
+    return data
+
+
+class Bundle:
+    """ One language's resources, patterns compiled on first use. """
+
+    def __init__(self, data):
+        self.lang = data['lang']
+        self.sources = data['sources']
+        self._values = {name: [NamedValue(*v) for v in values]
+                        for name, values in data['values'].items()}
+        self._pattern_sources = data['regex']
+        self._patterns = {}
+
+    def values(self, name):
+        """ NamedValues of dialog/<lang>/<name>.value, empty if missing. """
+        return self._values.get(name, [])
+
+    def named_values(self, name):
+        """ {name: value} of a .value file, like translate_namedvalues. """
+        return {v.name: v.value for v in self.values(name)}
+
+    def patterns(self, name):
+        """ Compiled patterns of regex/<lang>/<name>. """
+        patterns = self._patterns.get(name)
+        if patterns is None:
+            patterns = self._patterns[name] = [
+                re.compile(pat) for pat in self._pattern_sources.get(name, [])]
+        return patterns
+
+
+class ResourceBundles:
+    """ Lazily loaded bundles of every language.
+
+    Arguments:
+        root_dir (str): skill directory with the dialog/ and regex/ folders
+        bundle_dir (str): where bundles are kept, <root_dir>/bundles
+        check_interval (float): seconds between freshness checks of a
+                                language
+    """
+
+    def __init__(self, root_dir, bundle_dir=None, check_interval=5.0):
+        self.root_dir = root_dir
+        self.bundle_dir = bundle_dir or os.path.join(root_dir, 'bundles')
+        self.check_interval = check_interval
+        self._bundles = {}
+        self._checked = {}
+        self._lock = Lock()
+
+    def languages(self):
+        langs = set()
+        for folder in ('dialog', 'regex'):
+            path = os.path.join(self.root_dir, folder)
+            if os.path.isdir(path):
+                langs.update(d for d in os.listdir(path)
+                             if os.path.isdir(os.path.join(path, d)))
+        return sorted(langs)
+
+    def _load(self, lang):
+        path = os.path.join(self.bundle_dir, lang + '.bundle')
+        sources = source_stamps(self.root_dir, lang)
+        data = read_bundle(path)
+        if data is None or data['sources'] != sources:
+            data = compile_bundle(self.root_dir, lang)
+            try:
+                write_bundle(data, path)
+            except OSError:
+                pass  # read-only install, compiled again next time
+        return Bundle(data)
+
+    def get(self, lang):
+        """ Get the Bundle of a language, rebuilt if a source changed. """
+        now = time.monotonic()
+        with self._lock:
+            bundle = self._bundles.get(lang)
+            if bundle and now - self._checked[lang] < self.check_interval:
+                return bundle
+            if bundle is None or \
+                    bundle.sources != source_stamps(self.root_dir, lang):
+                bundle = self._bundles[lang] = self._load(lang)
+            self._checked[lang] = now
+            return bundle
+
+    def all_values(self, name):
+        """ NamedValues of <name>.value in every language. """
+        values = []
+        for lang in self.languages():
+            values.extend(self.get(lang).values(name))
+        return values
+
+    def search_group(self, lang, name, text, group):
+        """ Return `group` from the first pattern of regex/<lang>/<name>
+        that matches text.
+        """
+        for rx in self.get(lang).patterns(name):
+            if group not in rx.groupindex:
+                continue
+            res = rx.search(text)
+            if res:
+                return res.group(group)
+        return None
+
+
+def build_all(root_dir, bundle_dir=None):
+    bundles = ResourceBundles(root_dir, bundle_dir)
+    for lang in bundles.languages():
+        write_bundle(compile_bundle(root_dir, lang),
+                     os.path.join(bundles.bundle_dir, lang + '.bundle'))
+    return bundles.languages()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('usage: resources.py <skill directory> [bundle directory]')
+        sys.exit(1)
+    built = build_all(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print('built bundles for ' + ', '.join(built))
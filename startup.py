@@ -0,0 +1,69 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Lazy loading of heavy dependencies, with a report of what it cost. """
+
+import importlib
+import importlib.util
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Lock
+
+
+class StartupReport:
+    """ Wall time spent importing modules and building objects. """
+
+    def __init__(self):
+        self.timings = OrderedDict()
+        self._lock = Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0) + seconds
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def summary(self):
+        with self._lock:
+            timings = list(self.timings.items())
+        return ', '.join('{} {:.1f} ms'.format(name, seconds * 1000)
+                         for name, seconds in timings) or 'nothing loaded'
+
+
+def lazy_import(name, report=None, package=None):
+    """ Import a module the first time it is needed.
+
+    Arguments:
+        name (str): module name, relative ones need `package`
+        report (StartupReport): records the import time if given
+        package (str): anchor for relative names
+    """
+    absolute = importlib.util.resolve_name(name, package) if package \
+        else name
+    module = sys.modules.get(absolute)
+    if module is None:
+        if report:
+            with report.measure('import ' + absolute):
+                module = importlib.import_module(absolute)
+        else:
+            module = importlib.import_module(absolute)
+    return module
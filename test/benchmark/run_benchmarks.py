@@ -0,0 +1,345 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Offline latency benchmarks for the TimeSkill handlers.
+
+Drives the handlers through stubbed GUI, enclosure and bus objects with
+local stand-ins for Geonames and the Holiday API, then reports latency
+percentiles, allocations and throughput per scenario. Runs need
+mycroft-core and the skill requirements installed, but no network.
+
+    python test/benchmark/run_benchmarks.py                 # compare
+    python test/benchmark/run_benchmarks.py --save-baseline # record
+
+A scenario fails when its median latency exceeds the stored baseline by
+more than the tolerance, and the script then exits with status 1. Without
+a recorded baseline the checked-in ceilings of thresholds.json are used
+instead; they are deliberately loose and assume the default --latency.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stubs import (FakeBus, FakeEnclosure, FakeGUI, FakeService,
+                   geonames_response, holiday_api_response)
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'baseline.json')
+THRESHOLDS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'thresholds.json')
+
+CONFIG = {
+    'lang': 'en-us',
+    'time_format': 'half',
+    'date_format': 'MDY',
+    'location': {
+        'city': {'name': 'Lawrence',
+                 'state': {'name': 'Kansas',
+                           'country': {'name': 'United States',
+                                       'code': 'US'}}},
+        'timezone': {'code': 'America/Chicago', 'name': 'Central Standard'},
+    },
+}
+
+
+# A wall display's worth of zones for the world clock scenario
+WORLD_CLOCK_ZONES = ('London, Paris, Berlin, Moscow, Dubai, New Delhi, '
+                     'Singapore, Tokyo, Sydney, Auckland, Honolulu, '
+                     'Los Angeles, Chicago, New York, Sao Paulo')
+
+
+def load_skill_module():
+    """ Import the skill directory as a package, like the skill loader. """
+    spec = importlib.util.spec_from_file_location(
+        'time_skill', os.path.join(ROOT, '__init__.py'),
+        submodule_search_locations=[ROOT])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def create_skill(module, data_dir, settings):
+    skill = module.TimeSkill()
+    skill.root_dir = ROOT
+    skill.config_core = CONFIG
+    skill.bus = FakeBus()
+    skill.gui = FakeGUI()
+    skill.enclosure = FakeEnclosure()
+    skill.file_system.path = data_dir
+    skill.settings.update(settings)
+
+    # Scheduling and speech are Mycroft core's cost, not the skill's
+    skill.spoken = []
+    skill.speak_dialog = lambda key, data=None, **kwargs: \
+        skill.spoken.append((key, data))
+    skill.schedule_event = lambda *args, **kwargs: None
+    skill.schedule_repeating_event = lambda *args, **kwargs: None
+    skill.cancel_scheduled_event = lambda *args, **kwargs: None
+    skill.add_event = lambda *args, **kwargs: None
+    skill.register_intent_file = lambda *args, **kwargs: None
+
+    skill.initialize()
+    # Retry delays are real sleeps, keep the fault scenarios short
+    skill.http.backoff = skill.http.max_backoff = 0.005
+    return skill
+
+
+def utterance(text):
+    from mycroft.messagebus.message import Message
+    return Message('recognizer_loop:utterance', {'utterance': text})
+
+
+def holiday(name, location=None):
+    from mycroft.messagebus.message import Message
+    return Message('when.is.holiday', {'Holiday': name, 'Location': location,
+                                       'utterance': 'when is ' + name})
+
+
+def countdown(name):
+    from mycroft.messagebus.message import Message
+    return Message('recognizer_loop:utterance',
+                   {'utterance': 'how many days until ' + name,
+                    'HolidayHowManyDays': 'how many days until'})
+
+
+def scenarios(skill, flaky, down):
+    """ (name, callable, per-iteration setup or None) of every benchmark.
+
+    `flaky` answers with two 503s before every success, `down` with 503s
+    only, for the retry, circuit breaker and single-flight paths.
+    """
+    def idle():
+        skill.answering_query = False
+        skill.displayed_time = None
+
+    def forget_places():
+        idle()
+        skill.timezone_cache.clear()
+
+    def flaky_setup():
+        forget_places()
+        flaky.failures = 2
+
+    def geonames_at(service, func):
+        def run():
+            url = skill.settings['geonames_url']
+            skill.settings['geonames_url'] = service.url
+            try:
+                func()
+            finally:
+                skill.settings['geonames_url'] = url
+        return run
+
+    def concurrent_lookups():
+        # Same unknown place from 8 threads, one Geonames request expected
+        threads = [threading.Thread(target=skill.get_timezone,
+                                    args=('smallville',)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return [
+        ('current_time', lambda: skill.handle_query_current_time(
+            utterance('what time is it')), idle),
+        ('current_time_city', lambda: skill.handle_query_current_time(
+            utterance('what time is it in paris')), idle),
+        ('current_time_city_uncached', lambda: skill.handle_query_current_time(
+            utterance('what time is it in paris')), forget_places),
+        ('current_time_geonames', lambda: skill.handle_query_current_time(
+            utterance('what time is it in smallville')), forget_places),
+        ('future_time', lambda: skill.handle_query_future_time(
+            utterance('what time will it be in 5 hours')), idle),
+        ('query_date', lambda: skill.handle_query_date(
+            utterance('what is the date')), idle),
+        ('query_date_city', lambda: skill.handle_query_date(
+            utterance('what is the date in tokyo')), idle),
+        ('future_weekend', lambda: skill.handle_date_future_weekend(
+            utterance('what are the dates next weekend')), None),
+        ('last_weekend', lambda: skill.handle_date_last_weekend(
+            utterance('what were the dates last weekend')), None),
+        ('holiday_date', lambda: skill.handle_query_holiday_date(
+            holiday('christmas')), None),
+        ('holiday_date_country', lambda: skill.handle_query_holiday_date(
+            holiday('christmas', 'germany')), None),
+        ('holiday_countdown', lambda: skill.handle_query_holiday_countdown(
+            countdown('christmas')), None),
+        ('update_display', lambda: skill.update_display(True), idle),
+        ('world_clock_idle', lambda: skill.handle_idle(None), idle),
+        ('geonames_retry', geonames_at(flaky, lambda:
+            skill.handle_query_current_time(
+                utterance('what time is it in smallville'))), flaky_setup),
+        ('geonames_single_flight', concurrent_lookups, forget_places),
+        ('geonames_down', geonames_at(down, lambda:
+            skill.handle_query_current_time(
+                utterance('what time is it in smallville'))), forget_places),
+    ]
+
+
+def measure(func, setup, iterations, warmup):
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+
+    latencies = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+
+    # Separate pass, tracing slows everything down
+    allocated = []
+    tracemalloc.start()
+    for _ in range(max(1, iterations // 10)):
+        if setup:
+            setup()
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        allocated.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return {
+        'p50_ms': percentile(0.50) * 1000,
+        'p90_ms': percentile(0.90) * 1000,
+        'p99_ms': percentile(0.99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'throughput_per_s': len(latencies) / sum(latencies),
+        'peak_alloc_kb': statistics.mean(allocated) / 1024,
+    }
+
+
+def check_thresholds(results, thresholds):
+    """ Compare against the checked-in p50 ceilings (ms). """
+    regressions = []
+    for name, result in results.items():
+        limit = thresholds.get(name)
+        if limit is not None and result['p50_ms'] > limit:
+            regressions.append('{}: p50 {:.3f} ms > {:.3f} ms ceiling'.format(
+                name, result['p50_ms'], limit))
+    return regressions
+
+
+def compare(results, baseline, tolerance, slack_ms):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        limit = base['p50_ms'] * (1 + tolerance) + slack_ms
+        if result['p50_ms'] > limit:
+            regressions.append('{}: p50 {:.3f} ms > {:.3f} ms allowed'.format(
+                name, result['p50_ms'], limit))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('-n', '--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--provider', choices=['local', 'holidayapi'],
+                        default='local', help='holiday provider to drive')
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='seconds added by the fake web services')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative p50 regression')
+    parser.add_argument('--slack', type=float, default=0.05,
+                        help='allowed absolute p50 regression in ms')
+    parser.add_argument('--only', help='run scenarios containing this text')
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    geonames = FakeService(geonames_response, latency=args.latency)
+    holiday_api = FakeService(holiday_api_response, latency=args.latency)
+    flaky = FakeService(geonames_response, latency=args.latency)
+    down = FakeService(geonames_response, latency=args.latency,
+                       failures=float('inf'))
+    settings = {
+        'geonames_api_key': 'benchmark',
+        'geonames_url': geonames.url,
+        'holiday_provider': args.provider,
+        'holiday_api_key': 'benchmark',
+        'holiday_api_url': holiday_api.url,
+        'show_time': True,
+        'world_clock': True,
+        'world_clock_zones': WORLD_CLOCK_ZONES,
+    }
+
+    module = load_skill_module()
+    with tempfile.TemporaryDirectory() as data_dir:
+        skill = create_skill(module, data_dir, settings)
+        results = {}
+        for name, func, setup in scenarios(skill, flaky, down):
+            if args.only and args.only not in name:
+                continue
+            results[name] = measure(func, setup, args.iterations,
+                                    args.warmup)
+            r = results[name]
+            print('{:28} p50 {:8.3f} ms  p90 {:8.3f} ms  p99 {:8.3f} ms  '
+                  '{:9.1f}/s  {:8.1f} KiB'.format(
+                      name, r['p50_ms'], r['p90_ms'], r['p99_ms'],
+                      r['throughput_per_s'], r['peak_alloc_kb']))
+        skill.shutdown()
+
+    print('fake Geonames requests: {}, fake Holiday API requests: {}'.format(
+        geonames.requests, holiday_api.requests))
+    print('flaky Geonames requests: {}, failing Geonames requests: {}'.format(
+        flaky.requests, down.requests))
+    print('GUI messages: {}, batched GUI updates: {}'.format(
+        skill.gui.messages, sum(1 for m in skill.bus.emitted
+                                if m.msg_type == 'gui.value.set')))
+
+    if args.save_baseline:
+        with open(BASELINE, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print('baseline saved to ' + BASELINE)
+        return 0
+
+    if os.path.isfile(BASELINE):
+        with open(BASELINE) as f:
+            regressions = compare(results, json.load(f), args.tolerance,
+                                  args.slack)
+    else:
+        print('no baseline, checking the ceilings of ' + THRESHOLDS)
+        with open(THRESHOLDS) as f:
+            regressions = check_thresholds(results, json.load(f))
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
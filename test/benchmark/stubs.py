@@ -0,0 +1,162 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Offline stand-ins for the Mycroft runtime and the web services. """
+
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from urllib.parse import parse_qs, urlsplit
+
+
+class FakeBus:
+    """ Messagebus that records what is emitted and answers nothing. """
+
+    def __init__(self):
+        self.emitted = []
+        self.handlers = {}
+
+    def emit(self, message):
+        self.emitted.append(message)
+
+    def on(self, msg_type, handler):
+        self.handlers.setdefault(msg_type, []).append(handler)
+
+    once = on
+
+    def remove(self, msg_type, handler):
+        if handler in self.handlers.get(msg_type, []):
+            self.handlers[msg_type].remove(handler)
+
+    def remove_all_listeners(self, msg_type):
+        self.handlers.pop(msg_type, None)
+
+    def wait_for_response(self, message, reply_type=None, timeout=None):
+        self.emitted.append(message)
+        return None
+
+
+class FakeDisplayManager:
+    def get_active(self):
+        return ''
+
+    def remove_active(self):
+        pass
+
+
+class FakeEnclosure:
+    """ Mark 1 enclosure counting the messages it would send. """
+
+    def __init__(self):
+        self.messages = 0
+        self.display_manager = FakeDisplayManager()
+
+    def _send(self, *args, **kwargs):
+        self.messages += 1
+
+    mouth_display = mouth_text = mouth_reset = _send
+    activate_mouth_events = deactivate_mouth_events = _send
+
+
+class FakeGUI(dict):
+    """ GUI session data counting the updates it would send.
+
+    Like SkillGUI, setting a value only sends a message once a page has
+    been shown.
+    """
+
+    def __init__(self):
+        super(FakeGUI, self).__init__()
+        self.messages = 0
+        self.page = None
+
+    def __setitem__(self, key, value):
+        if self.page:
+            self.messages += 1
+        super(FakeGUI, self).__setitem__(key, value)
+
+    def clear(self):
+        self.messages += 1
+        super(FakeGUI, self).clear()
+
+    def show_page(self, page, override_idle=None):
+        self.messages += 1
+        self.page = page
+
+
+class _FakeServiceHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        time.sleep(server.latency)
+        if server.failures > 0:
+            server.failures -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        query = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query)
+                 .items()}
+        body = json.dumps(server.respond(query)).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeService(ThreadingHTTPServer):
+    """ Local HTTP server standing in for Geonames or the Holiday API.
+
+    Arguments:
+        respond (callable): respond(query dict) -> JSON-able body
+        latency (float): seconds added to every request
+        failures (int): number of first requests answered with a 503,
+                        float('inf') for a service that is down
+    """
+    daemon_threads = True
+
+    def __init__(self, respond, latency=0.0, failures=0):
+        super(FakeService, self).__init__(('127.0.0.1', 0),
+                                          _FakeServiceHandler)
+        self.respond = respond
+        self.latency = latency
+        self.failures = failures
+        self.requests = 0
+        Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}/'.format(self.server_port)
+
+
+def geonames_response(query):
+    """ A searchJSON answer placing every query in Topeka, Kansas. """
+    return {'geonames': [{'name': query.get('q', 'Topeka').title(),
+                          'countryName': 'United States',
+                          'lat': '39.04833', 'lng': '-95.67804'}]}
+
+
+def holiday_api_response(query):
+    """ A Holiday API answer with a handful of fixed-date holidays. """
+    year = int(query.get('year', 2020))
+    holidays = [("New Year's Day", '01-01'), ('Valentines Day', '02-14'),
+                ('Independence Day', '07-04'), ('Halloween', '10-31'),
+                ('Christmas Eve', '12-24'), ('Christmas Day', '12-25')]
+    return {'status': 200,
+            'holidays': [{'name': name, 'date': '{}-{}'.format(year, day)}
+                         for name, day in holidays]}
@@ -0,0 +1,37 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Import the skill's helper modules without the skill itself.
+
+The skill's __init__.py needs a Mycroft install, the helper modules only
+import each other relatively. They are loaded as submodules of a bare
+package pointing at the skill directory.
+"""
+
+import importlib
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+PACKAGE = 'skill_time'
+
+
+def load_skill_module(name):
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [ROOT]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(PACKAGE + '.' + name)
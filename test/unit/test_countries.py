@@ -0,0 +1,44 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Country lookups complete and correct names, but not other places. """
+
+import os
+
+import pytest
+
+from skill_modules import ROOT, load_skill_module
+
+countries = load_skill_module('countries')
+resources = load_skill_module('resources')
+
+index = countries.CountryIndex(lambda: [
+    (key, code.upper()) for name, key, code in resources.read_values(
+        os.path.join(ROOT, 'dialog', 'en-us', 'countries.value'))])
+
+
+@pytest.mark.parametrize('name, code', [
+    ('germany', 'DE'), ('republic of latvia', 'LV'), ('the netherlands', 'NL'),
+    ('united kingd', 'GB'), ('germny', 'DE'), ('switzerlnd', 'CH'),
+    ('ne', 'NE'), ('usa', 'US'),
+])
+def test_finds_countries(name, code):
+    assert index.lookup(name) == code
+
+
+@pytest.mark.parametrize('name', [
+    'indiana', 'indian', 'lagos', 'roman', 'new', 'paris', 'cambridge',
+])
+def test_other_places_are_not_countries(name):
+    assert index.lookup(name) is None
@@ -0,0 +1,37 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" The local provider lists every holiday of a shared date. """
+
+import pytest
+
+from skill_modules import load_skill_module
+
+pytest.importorskip('holidays')
+providers = load_skill_module('holiday_providers')
+
+
+@pytest.mark.parametrize('country, year, date, names', [
+    ('IT', 2026, '2026-11-01', ["All Saints' Day", 'National Unity Day']),
+    ('IN', 2027, '2027-08-15', ['Independence Day',
+                                "Prophet's Birthday (estimated)"]),
+])
+def test_shared_date_is_split(country, year, date, names):
+    table = providers.LocalHolidayProvider().holidays(country, year)
+    assert [h['name'] for h in table if h['date'] == date] == names
+
+
+def test_joined_names_are_split():
+    assert providers._JOINED_NAMES.split('A; B') == ['A', 'B']
+    assert providers._JOINED_NAMES.split('A, B') == ['A', 'B']
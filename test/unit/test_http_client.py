@@ -0,0 +1,152 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Retries, single-flight and circuit breaking of the HTTP client. """
+
+import time
+from threading import Event, Thread
+
+import pytest
+
+from skill_modules import load_skill_module
+
+http_client = load_skill_module('http_client')
+
+URL = 'http://service.invalid/search'
+
+
+class Response:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+class Session:
+    """ Answers with a 503 `failures` times, then with `body`. """
+
+    def __init__(self, failures=0, body=None, gate=None):
+        self.failures = failures
+        self.body = body or {'ok': True}
+        self.gate = gate
+        self.requests = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.requests += 1
+        if self.gate:
+            self.gate.wait(5)
+        if self.requests <= self.failures:
+            return Response(503, None)
+        return Response(200, self.body)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def client(session, clock=None, **kwargs):
+    return http_client.HttpClient(session=session, sleep=lambda s: None,
+                                  clock=clock or Clock(), **kwargs)
+
+
+def test_retries_server_errors():
+    session = Session(failures=2)
+    assert client(session).get_json(URL) == {'ok': True}
+    assert session.requests == 3
+
+
+def test_gives_up_after_the_retries():
+    session = Session(failures=float('inf'))
+    with pytest.raises(http_client.ServiceUnavailable):
+        client(session, retries=3, breaker_threshold=10).get_json(URL)
+    assert session.requests == 4
+
+
+def test_client_errors_are_answers():
+    session = Session()
+    session.get = lambda *args, **kwargs: Response(401, {'status': 401})
+    assert client(session).get_json(URL) == {'status': 401}
+
+
+class CountingEvent(Event):
+    """ Event counting the callers waiting on it. """
+    waiting = 0
+
+    def wait(self, timeout=None):
+        CountingEvent.waiting += 1
+        return super(CountingEvent, self).wait(timeout)
+
+
+def test_concurrent_calls_share_one_request(monkeypatch):
+    monkeypatch.setattr(http_client, 'Event', CountingEvent)
+    gate = Event()
+    session = Session(gate=gate)
+    http = client(session)
+    results = []
+    threads = [Thread(target=lambda: results.append(
+        http.get_json(URL, {'q': 'davos'}))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Answer once the other seven wait for the first one's request
+    deadline = time.monotonic() + 5
+    while CountingEvent.waiting < 7 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert session.requests == 1
+    assert results == [{'ok': True}] * 8
+
+
+def test_open_circuit_stops_requests():
+    clock = Clock()
+    session = Session(failures=float('inf'))
+    http = client(session, clock, retries=0, breaker_threshold=2,
+                  breaker_cooldown=30)
+    for _ in range(2):
+        with pytest.raises(http_client.ServiceUnavailable):
+            http.get_json(URL)
+    assert session.requests == 2
+    with pytest.raises(http_client.ServiceUnavailable):
+        http.get_json(URL)
+    assert session.requests == 2
+
+    # One trial request after the cooldown, which closes it again
+    clock.now = 30
+    session.failures = 0
+    assert http.get_json(URL) == {'ok': True}
+    assert session.requests == 3
+    assert not http.breaker(URL).is_open
+
+
+def test_breaker_cooldown():
+    clock = Clock()
+    breaker = http_client.CircuitBreaker(threshold=2, cooldown=10,
+                                         clock=clock)
+    breaker.failure()
+    assert not breaker.is_open
+    breaker.failure()
+    assert breaker.is_open
+    clock.now = 10
+    assert not breaker.is_open
+    breaker.failure()
+    assert breaker.is_open
+    breaker.success()
+    assert not breaker.is_open
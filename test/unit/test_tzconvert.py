@@ -0,0 +1,92 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" tzconvert must give the same local times as datetime.astimezone. """
+
+import datetime
+import importlib.util
+import os
+import random
+
+import pytest
+import pytz
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+# Fixed, DST in either hemisphere, half/quarter hours, rule changes
+ZONES = ['UTC', 'Etc/GMT+8', 'America/New_York', 'Europe/London',
+         'Australia/Sydney', 'Asia/Kolkata', 'Asia/Kathmandu',
+         'America/Sao_Paulo', 'Europe/Moscow', 'Pacific/Apia']
+
+
+def load_tzconvert():
+    spec = importlib.util.spec_from_file_location(
+        'tzconvert', os.path.join(ROOT, 'tzconvert.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+tzconvert = load_tzconvert()
+
+
+def expected(ts, tz):
+    dt = datetime.datetime.fromtimestamp(ts, pytz.utc).astimezone(tz)
+    wall = dt.replace(tzinfo=None, microsecond=0)
+    return (str(wall).replace(' ', 'T'), int(dt.utcoffset().total_seconds()),
+            bool(dt.dst()), dt.weekday())
+
+
+def timestamps(tz):
+    rng = random.Random(tz.zone)
+    samples = [rng.uniform(-2e9, 4e9) for _ in range(1500)]
+    samples += [rng.randint(-2 * 10 ** 9, 4 * 10 ** 9) for _ in range(1500)]
+    samples += [-1.5, -0.5, 0, 0.5, 1.5]
+    # Both sides of every transition
+    for t in getattr(tz, '_utc_transition_times', [])[1:]:
+        edge = (t - tzconvert.EPOCH).total_seconds()
+        samples += [edge - 1, edge, edge + 0.5]
+    return samples
+
+
+@pytest.mark.parametrize('zone', ZONES)
+def test_matches_pytz(zone):
+    tz = pytz.timezone(zone)
+    samples = timestamps(tz)
+    local = tzconvert.to_local_many(samples, tz)
+    walls = tzconvert.wall_datetimes(local)
+    for i, ts in enumerate(samples):
+        assert (str(walls[i]), int(local.offset[i]), bool(local.dst[i]),
+                int(local.weekday[i])) == expected(ts, tz), ts
+
+
+@pytest.mark.parametrize('ts', [float('nan'), float('inf'), -float('inf'),
+                                1e20, -1e20, tzconvert.MAX_TIMESTAMP + 1,
+                                tzconvert.MIN_TIMESTAMP - 1, 10 ** 400,
+                                True, '0', None])
+def test_rejects_invalid(ts):
+    assert not tzconvert.valid_timestamp(ts)
+    if isinstance(ts, float) or type(ts) is int and abs(ts) < 2 ** 63:
+        with pytest.raises(ValueError):
+            tzconvert.to_local_many([0, ts], pytz.timezone('Asia/Tokyo'))
+
+
+def test_accepts_datetime_range():
+    tz = pytz.utc
+    samples = [tzconvert.MIN_TIMESTAMP, tzconvert.MAX_TIMESTAMP + 0.5]
+    assert all(tzconvert.valid_timestamp(ts) for ts in samples)
+    local = tzconvert.to_local_many(samples, tz)
+    walls = tzconvert.wall_datetimes(local)
+    assert str(walls[-1]) == expected(tzconvert.MAX_TIMESTAMP, tz)[0]
@@ -0,0 +1,119 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Bulk UTC to local time conversion from pytz transition tables.
+
+A zone's UTC offset changes only at its transitions, so converting many
+timestamps is one binary search (numpy.searchsorted) over the transition
+times plus an array add, with results identical to `dt.astimezone(tz)`.
+"""
+
+import datetime
+import math
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+import pytz
+
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# Arrays of local wall time (POSIX seconds as if the zone were UTC), UTC
+# offset in seconds, DST flag and weekday (Monday is 0)
+LocalTimes = namedtuple('LocalTimes', ['local', 'offset', 'dst', 'weekday'])
+
+
+def _seconds(td):
+    return int(td.total_seconds())
+
+
+# Seconds datetime can represent, 0001-01-01 to 9999-12-31 23:59:59
+MIN_TIMESTAMP = _seconds(datetime.datetime(1, 1, 1) - EPOCH)
+MAX_TIMESTAMP = _seconds(datetime.datetime(9999, 12, 31, 23, 59, 59) - EPOCH)
+
+
+def valid_timestamp(ts):
+    """ Check that a number is a timestamp in datetime's range. """
+    if not isinstance(ts, (int, float)) or isinstance(ts, bool):
+        return False
+    if isinstance(ts, float) and not math.isfinite(ts):
+        return False
+    return MIN_TIMESTAMP <= math.floor(ts) <= MAX_TIMESTAMP
+
+
+class TransitionTable:
+    """ Precomputed offsets of one zone as compact arrays. """
+
+    def __init__(self, tz):
+        self.zone = getattr(tz, 'zone', str(tz))
+        transitions = getattr(tz, '_utc_transition_times', None)
+        if transitions:
+            info = tz._transition_info
+            self.times = np.array([_seconds(t - EPOCH) for t in transitions],
+                                  dtype=np.int64)
+            self.offsets = np.array([_seconds(i[0]) for i in info],
+                                    dtype=np.int64)
+            self.dst = np.array([bool(i[1]) for i in info], dtype=bool)
+        else:
+            # Fixed offset zones (UTC, Etc/GMT+8, ...)
+            offset = tz.utcoffset(datetime.datetime(2000, 1, 1))
+            self.times = np.array([np.iinfo(np.int64).min], dtype=np.int64)
+            self.offsets = np.array([_seconds(offset)], dtype=np.int64)
+            self.dst = np.array([False], dtype=bool)
+
+    def convert(self, timestamps):
+        """ Convert POSIX timestamps (seconds since the epoch, UTC).
+
+        Arguments:
+            timestamps (array-like): int or float seconds
+
+        Returns:
+            LocalTimes: arrays shaped like `timestamps`
+
+        Raises:
+            ValueError: NaN, infinite or outside datetime's years 1-9999
+        """
+        ts = np.asarray(timestamps)
+        if ts.dtype.kind == 'f':
+            if not np.isfinite(ts).all():
+                raise ValueError('timestamps must be finite')
+            # Whole seconds rounded down, like datetime.fromtimestamp
+            ts = np.floor(ts)
+        if ts.size and (ts.min() < MIN_TIMESTAMP or ts.max() > MAX_TIMESTAMP):
+            raise ValueError('timestamps out of range')
+        ts = ts.astype(np.int64)
+        idx = np.searchsorted(self.times, ts, side='right') - 1
+        np.clip(idx, 0, len(self.times) - 1, out=idx)
+        offset = self.offsets[idx]
+        local = ts + offset
+        # 1970-01-01 was a Thursday
+        weekday = (np.floor_divide(local, 86400) + 3) % 7
+        return LocalTimes(local, offset, self.dst[idx], weekday)
+
+
+@lru_cache(maxsize=512)
+def transition_table(zone):
+    """ Get the (cached) transition table of a timezone name. """
+    return TransitionTable(pytz.timezone(zone))
+
+
+def to_local_many(timestamps, tz):
+    """ Convert many UTC timestamps to local times in `tz` at once. """
+    return transition_table(getattr(tz, 'zone', tz)).convert(timestamps)
+
+
+def wall_datetimes(local_times):
+    """ Turn LocalTimes.local into numpy datetime64 wall clock values. """
+    return np.asarray(local_times.local).astype('datetime64[s]')
@@ -0,0 +1,76 @@
+import QtQuick.Layouts 1.4
+import QtQuick 2.4
+import QtQuick.Controls 2.0
+import org.kde.kirigami 2.4 as Kirigami
+
+import Mycroft 1.0 as Mycroft
+
+Mycroft.Delegate {
+    background: Image {
+        source: Qt.resolvedUrl("img/nasa.png")
+        anchors.fill: parent
+        fillMode: Image.PreserveAspectCrop
+    }
+    ColumnLayout {
+        id: grid
+        anchors.fill: parent
+        spacing: Kirigami.Units.largeSpacing
+        Label {
+            id: time
+            Layout.alignment: Qt.AlignCenter
+            font.capitalization: Font.AllUppercase
+            font.family: "Noto Sans Display"
+            font.weight: Font.Bold
+            font.pixelSize: 90
+            color: "white"
+            text: sessionData.time_string.replace(":", "꞉")
+        }
+        Label {
+            id: date
+            Layout.alignment: Qt.AlignCenter
+            font.pixelSize: 35
+            font.family: "Noto Sans Display"
+            font.bold: true
+            color: "white"
+            text: sessionData.weekday_string + " " + sessionData.month_string
+        }
+        GridLayout {
+            id: zones
+            Layout.fillWidth: true
+            Layout.fillHeight: true
+            columns: sessionData.world_zones.length > 6 ? 3 : 2
+            columnSpacing: Kirigami.Units.largeSpacing * 2
+            rowSpacing: Kirigami.Units.largeSpacing
+            Repeater {
+                model: sessionData.world_zones
+                delegate: ColumnLayout {
+                    Layout.fillWidth: true
+                    spacing: 0
+                    Label {
+                        Layout.alignment: Qt.AlignCenter
+                        font.pixelSize: 28
+                        font.family: "Noto Sans Display"
+                        elide: Text.ElideRight
+                        color: "white"
+                        text: modelData.name
+                    }
+                    Label {
+                        Layout.alignment: Qt.AlignCenter
+                        font.pixelSize: 45
+                        font.family: "Noto Sans Display"
+                        font.bold: true
+                        color: "white"
+                        text: modelData.time_string.replace(":", "꞉")
+                    }
+                    Label {
+                        Layout.alignment: Qt.AlignCenter
+                        font.pixelSize: 20
+                        font.family: "Noto Sans Display"
+                        color: "white"
+                        text: modelData.weekday_string
+                    }
+                }
+            }
+        }
+    }
+}
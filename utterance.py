@@ -0,0 +1,131 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" One memoized parse of a date/time utterance for all the handlers. """
+
+import time
+
+from .cache import MISSING, ResolutionCache
+
+
+_UNSET = object()
+
+
+class ParsedUtterance:
+    """ One utterance, each part extracted on first use and then kept.
+
+    text: the lowercased utterance, normalized: after normalize(),
+    datetime: extracted date/time or None, remainder: normalized text
+    left after the date/time words, year: a spoken year (1500-3000) or
+    None, location: place name in the text, date_location: place name in
+    the remainder, so "in 5 hours in paris" is not "5 hours".
+    """
+
+    def __init__(self, parser, text, lang):
+        self._parser = parser
+        self.text = text
+        self.lang = lang
+        self._normalized = _UNSET
+        self._extract = _UNSET
+        self._year = _UNSET
+        self._location = _UNSET
+        self._date_location = _UNSET
+
+    @property
+    def normalized(self):
+        if self._normalized is _UNSET:
+            # Articles are kept, they are part of names like "the hague"
+            self._normalized = self._parser.normalize(
+                self.text, self.lang, remove_articles=False)
+        return self._normalized
+
+    def _extracted(self):
+        if self._extract is _UNSET:
+            extract = self._parser.extract_datetime(self.normalized,
+                                                    lang=self.lang)
+            self._extract = tuple(extract) if extract else \
+                (None, self.normalized)
+        return self._extract
+
+    @property
+    def datetime(self):
+        return self._extracted()[0]
+
+    @property
+    def remainder(self):
+        return self._extracted()[1]
+
+    @property
+    def year(self):
+        if self._year is _UNSET:
+            year = self._parser.extract_number(self.normalized,
+                                               lang=self.lang)
+            # filter out non-years
+            self._year = int(year) if year and 1500 <= year <= 3000 \
+                else None
+        return self._year
+
+    @property
+    def location(self):
+        if self._location is _UNSET:
+            self._location = self._parser.extract_location(self.text)
+        return self._location
+
+    @property
+    def date_location(self):
+        if self._date_location is _UNSET:
+            self._date_location = \
+                self._parser.extract_location(self.remainder) \
+                if self.datetime else self.location
+        return self._date_location
+
+
+class UtteranceParser:
+    """ Memoized, lazily evaluated parses of date/time utterances.
+
+    A handler only pays for the parts it reads: the location regex alone
+    for "what time is it in paris", extract_datetime and extract_number
+    only for the date and future time questions.
+
+    extract_datetime resolves relative phrases ("tomorrow", "in 5 hours")
+    against the current time, so a parse is only reused within the minute
+    it was made in, which is all the spoken and displayed answers show.
+
+    Arguments:
+        normalize (callable): mycroft.util.parse.normalize
+        extract_datetime (callable): mycroft.util.parse.extract_datetime
+        extract_number (callable): mycroft.util.parse.extract_number
+        extract_location (callable): extract_location(text) -> str or None
+        max_size (int): parses kept
+    """
+
+    def __init__(self, normalize, extract_datetime, extract_number,
+                 extract_location, max_size=64, clock=time.time):
+        self.normalize = normalize
+        self.extract_datetime = extract_datetime
+        self.extract_number = extract_number
+        self.extract_location = extract_location
+        self._clock = clock
+        self.cache = ResolutionCache(max_size=max_size, ttl=60,
+                                     negative_ttl=60)
+
+    def parse(self, utterance, lang):
+        """ Get the ParsedUtterance of `utterance`, memoized. """
+        text = ' '.join((utterance or '').lower().split())
+        key = (lang, text, int(self._clock() // 60))
+        parsed = self.cache.get(key)
+        if parsed is MISSING:
+            parsed = ParsedUtterance(self, text, lang)
+            self.cache.put(key, parsed)
+        return parsed
@@ -0,0 +1,182 @@
+# Copyright 2017, Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" World clock of several zones, updated by the one clock tick. """
+
+import datetime
+import time
+from bisect import bisect_right
+from threading import Lock
+
+
+EPOCH = datetime.datetime(1970, 1, 1)
+FOREVER = float('inf')
+
+
+def parse_zones(setting):
+    """ Split the comma separated world_clock_zones setting. """
+    return tuple(name.strip() for name in (setting or '').split(',')
+                 if name.strip())
+
+
+def zone_offset(tz, timestamp):
+    """ Get the UTC offset (seconds) of a pytz zone at a POSIX timestamp,
+    and the timestamp until which that offset holds.
+    """
+    transitions = getattr(tz, '_utc_transition_times', None)
+    if not transitions:
+        # Fixed offset zones (UTC, Etc/GMT+8, ...)
+        return int(tz.utcoffset(EPOCH).total_seconds()), FOREVER
+    pos = bisect_right(transitions,
+                       EPOCH + datetime.timedelta(seconds=timestamp))
+    offset = tz._transition_info[max(pos - 1, 0)][0]
+    until = (transitions[pos] - EPOCH).total_seconds() \
+        if pos < len(transitions) else FOREVER
+    return int(offset.total_seconds()), until
+
+
+class WorldZone:
+    __slots__ = ('name', 'tz', 'offset', 'until', 'minute', 'entry')
+
+    def __init__(self, name, tz):
+        self.name = name
+        self.tz = tz
+        self.offset = None
+        self.until = -FOREVER
+        self.minute = None
+        self.entry = None
+
+
+class WorldClock:
+    """ Time strings of the configured zones.
+
+    Names are resolved by resolve_pending(), meant to run off the GUI
+    path since a lookup may go to the network. Names that fail are tried
+    again every `retry_interval` seconds, so a place that was unknown
+    while Geonames was down shows up once it is back. A tick only looks a
+    zone's offset up again after its next transition and only formats its
+    time when the local minute changed, so each zone costs a few integer
+    operations per minute.
+
+    Arguments:
+        resolve (callable): resolve(name) -> pytz timezone or None
+        retry_interval (float): seconds before unresolved names are retried
+    """
+
+    def __init__(self, resolve, retry_interval=60, clock=time.monotonic):
+        self._resolve = resolve
+        self.retry_interval = retry_interval
+        self._clock = clock
+        self._lock = Lock()
+        self.names = ()
+        self.zones = []
+        self.unresolved = []
+        self._resolved = {}
+        self._resolving = False
+        self._retry_at = -FOREVER
+        self._format_settings = None
+        self._entries = []
+
+    def configure(self, names):
+        """ Set the list of place or zone names, resolved later. """
+        names = tuple(names)
+        with self._lock:
+            if names == self.names:
+                return
+            self.names = names
+            # Zones still configured keep their resolution
+            self._resolved = {name: zone for name, zone
+                              in self._resolved.items() if name in names}
+            self.unresolved = [name for name in names
+                               if name not in self._resolved]
+            self._retry_at = -FOREVER
+            self._set_zones()
+
+    def _set_zones(self):
+        self.zones = [self._resolved[name] for name in self.names
+                      if name in self._resolved]
+        self._entries = []
+
+    def claim_pending(self):
+        """ Check if names are due for resolving and claim them.
+
+        Returns:
+            bool: True if the caller must run resolve_pending()
+        """
+        with self._lock:
+            if self._resolving or not self.unresolved or \
+                    self._clock() < self._retry_at:
+                return False
+            self._resolving = True
+            return True
+
+    def resolve_pending(self):
+        """ Resolve the unresolved names, after claim_pending().
+
+        Returns:
+            list: names that are still unresolved
+        """
+        with self._lock:
+            names, pending = self.names, list(self.unresolved)
+        found = {}
+        try:
+            for name in pending:
+                tz = self._resolve(name)
+                if tz:
+                    found[name] = WorldZone(name, tz)
+        finally:
+            with self._lock:
+                self._resolving = False
+                if names == self.names:
+                    # Not reconfigured in the meantime
+                    self._resolved.update(found)
+                    self.unresolved = [name for name in self.unresolved
+                                       if name not in found]
+                    if found:
+                        self._set_zones()
+                    self._retry_at = self._clock() + self.retry_interval
+        return list(self.unresolved)
+
+    def update(self, timestamp, formats):
+        """ Get the GUI entries of every zone at a POSIX timestamp.
+
+        The same list is returned as long as no zone's strings changed.
+        """
+        zones = self.zones
+        if formats.settings != self._format_settings:
+            # 12/24 hour or language changed, format everything again
+            self._format_settings = formats.settings
+            for zone in zones:
+                zone.minute = None
+
+        changed = False
+        for zone in zones:
+            if timestamp >= zone.until:
+                offset, zone.until = zone_offset(zone.tz, timestamp)
+                if offset != zone.offset:
+                    zone.offset = offset
+                    zone.minute = None
+            minute = (int(timestamp) + zone.offset) // 60
+            if minute != zone.minute:
+                zone.minute = minute
+                local = EPOCH + datetime.timedelta(minutes=minute)
+                entry = {'name': zone.name,
+                         'time_string': formats.display_time(local),
+                         'weekday_string': formats.weekday(local)}
+                if entry != zone.entry:
+                    zone.entry = entry
+                    changed = True
+        if changed or len(self._entries) != len(zones):
+            self._entries = [zone.entry for zone in zones]
+        return self._entries